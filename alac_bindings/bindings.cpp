@@ -6,16 +6,24 @@ Minimal wrapper to encode and aes encrypt alac data.
 #include <pybind11/pybind11.h>
 
 #include <cstring>
-#include <openssl/aes.h>
-#include <openssl/engine.h>
-#include <openssl/rand.h>
+#include <mutex>
+#include <stdexcept>
+#include <openssl/evp.h>
+
+#ifdef _WIN32
+#include <winsock2.h>
+#include <ws2tcpip.h>
+#define LAST_SOCKET_ERROR WSAGetLastError()
+#else
+#include <cerrno>
+#include <sys/socket.h>
+#include <netinet/in.h>
+#include <arpa/inet.h>
+#define LAST_SOCKET_ERROR errno
+#endif
 
 namespace py = pybind11;
 
-extern "C" {
-    #include "aes_utils.h"
-}
-
 #include "base64.h"
 
 #include "alac/ALACEncoder.h"
@@ -24,6 +32,8 @@ extern "C" {
 #define kBlockSize 16
 #define kFramesPerPacket 352
 #define kSampleRate 44100
+#define kRTPHeaderSize 12
+#define kBytesPerFrame 4
 
 // These values should be changed at each iteration
 static uint8_t iv [] = { 0x78, 0xf4, 0x41, 0x2c, 0x8d, 0x17, 0x37, 0x90, 0x2b, 0x15, 0xa6, 0xb3, 0xee, 0x77, 0x0d, 0x67 };
@@ -57,38 +67,290 @@ void FillOutputAudioFormat(AudioFormatDescription *format, int frames_per_packet
   format->mReserved = 0;
 }
 
+// The encoder keeps state between packets and is used without the GIL, therefore every encode call needs this lock.
+static std::mutex encoder_mutex;
+
+std::vector<unsigned char> EncodeALAC(ALACEncoder *encoder, std::vector<unsigned char> &pcmData, int sample_rate) {
+    std::lock_guard<std::mutex> lock(encoder_mutex);
+
+    AudioFormatDescription inputFormat, outputFormat;
+    FillInputAudioFormat(&inputFormat, sample_rate);
+    FillOutputAudioFormat(&outputFormat, encoder->GetFrameSize());
+
+    int32_t alacSize = pcmData.size();
+    std::vector<unsigned char> alacData(alacSize);
+
+    encoder->Encode(inputFormat, outputFormat, pcmData.data(), alacData.data(), &alacSize);
+
+    return alacData;
+}
+
+// Cipher context which is shared by all calls to EncryptAES. Only the iv is reset per call, this way OpenSSL does
+// not need to expand the key again for every packet and can use AES-NI if the cpu supports it.
+static EVP_CIPHER_CTX *aes_ctx = NULL;
+// The encryption functions run without the GIL, therefore the shared context needs its own lock.
+static std::mutex aes_mutex;
+
+void InitAESContext() {
+    aes_ctx = EVP_CIPHER_CTX_new();
+    if (aes_ctx == NULL)
+        throw std::runtime_error("Could not create the aes cipher context.");
+
+    EVP_EncryptInit_ex(aes_ctx, EVP_aes_128_cbc(), NULL, aes_key, iv);
+    // Only full blocks are encrypted, the remaining bytes are send unencrypted.
+    EVP_CIPHER_CTX_set_padding(aes_ctx, 0);
+}
+
+void EncryptAESInPlace(unsigned char *data, int size) {
+    int alacSize = (size / kBlockSize) * kBlockSize;
+    int outSize = 0;
+
+    if (alacSize == 0)
+        return;
+
+    std::lock_guard<std::mutex> lock(aes_mutex);
+    EVP_EncryptInit_ex(aes_ctx, NULL, NULL, NULL, iv);
+    EVP_EncryptUpdate(aes_ctx, data, &outSize, data, alacSize);
+}
+
 std::vector<unsigned char> EncryptAES(std::vector<unsigned char> alacData) {
     // This will encrypt data in-place
-    unsigned char *data = alacData.data();
-    int32_t alacSize = alacData.size();
+    EncryptAESInPlace(alacData.data(), alacData.size());
+    return alacData;
+}
 
-    uint8_t *buf;
-    int i = 0, j;
-    uint8_t *nv = new uint8_t[kBlockSize];
+void WriteRTPHeader(unsigned char *out, uint16_t seq, uint32_t timestamp, uint32_t device_magic, bool is_first) {
+    out[0] = 0x80;
+    out[1] = is_first ? 0xe0 : 0x60;
+    out[2] = seq >> 8;
+    out[3] = seq & 0xff;
+    for (int i = 0; i < 4; i++) {
+        out[4+i] = (timestamp >> (24 - 8*i)) & 0xff;
+        out[8+i] = (device_magic >> (24 - 8*i)) & 0xff;
+    }
+}
 
-    aes_context ctx;
-    aes_set_key(&ctx, aes_key, 128);
-    memcpy(nv, iv, kBlockSize);
+size_t MaxPacketSize(ALACEncoder *encoder) {
+    // in the worst case the encoder stores the pcm data uncompressed with an additional escape header
+    return kRTPHeaderSize + encoder->GetFrameSize() * kBytesPerFrame + kALACMaxEscapeHeaderBytes;
+}
 
-    while(i + kBlockSize <= alacSize) {
-    buf = data + i;
+py::buffer_info RequestPacketBuffer(ALACEncoder *encoder, py::object out) {
+    if (out.is_none())
+        return py::buffer_info();
 
-    for(j = 0; j < kBlockSize; j++)
-      buf[j] ^= nv[j];
+    py::buffer_info info = py::buffer(out).request(true);
+    if ((size_t)(info.size * info.itemsize) < MaxPacketSize(encoder))
+        throw std::length_error("The packet buffer is too small.");
 
-    aes_encrypt(&ctx, buf, buf);
-    memcpy(nv, buf, kBlockSize);
+    return info;
+}
 
-    i += kBlockSize;
+py::buffer_info RequestPCMBuffer(ALACEncoder *encoder, const py::buffer &pcmBuffer) {
+    py::buffer_info pcm = pcmBuffer.request();
+    if ((size_t)(pcm.size * pcm.itemsize) > encoder->GetFrameSize() * kBytesPerFrame)
+        throw std::length_error("The pcm data is larger than a single packet.");
+    return pcm;
+}
+
+// Encode a single packet into the plain and / or the encrypted packet buffer. This does not access any python objects,
+// therefore it can run without the GIL.
+int32_t EncodePacketInto(ALACEncoder *encoder, unsigned char *pcm, int32_t pcmSize, unsigned char *plain,
+                         unsigned char *encrypted, uint16_t seq, uint32_t timestamp, uint32_t device_magic,
+                         bool is_first, int sample_rate) {
+    // the alac data is encoded directly into the first available packet buffer
+    unsigned char *packet = plain ? plain : encrypted;
+    if (packet == NULL)
+        return 0;
+
+    AudioFormatDescription inputFormat, outputFormat;
+    FillInputAudioFormat(&inputFormat, sample_rate);
+    FillOutputAudioFormat(&outputFormat, encoder->GetFrameSize());
+
+    int32_t alacSize = pcmSize;
+    encoder->Encode(inputFormat, outputFormat, pcm, packet + kRTPHeaderSize, &alacSize);
+    WriteRTPHeader(packet, seq, timestamp, device_magic, is_first);
+
+    if (encrypted) {
+        if (encrypted != packet)
+            memcpy(encrypted, packet, kRTPHeaderSize + alacSize);
+        EncryptAESInPlace(encrypted + kRTPHeaderSize, alacSize);
     }
 
-    return alacData;
+    return kRTPHeaderSize + alacSize;
+}
+
+void RaiseSocketError(int error) {
+#ifdef _WIN32
+    PyErr_SetFromWindowsErr(error);
+#else
+    errno = error;
+    PyErr_SetFromErrno(PyExc_OSError);
+#endif
+    throw py::error_already_set();
+}
+
+typedef std::vector<std::pair<std::string, int>> AddressList;
+
+struct PacketData {
+    void *data;
+    size_t size;
+};
+
+std::vector<struct sockaddr_in> ParseAddresses(const AddressList &addresses) {
+    std::vector<struct sockaddr_in> sockAddresses(addresses.size());
+    for (size_t i = 0; i < addresses.size(); i++) {
+        memset(&sockAddresses[i], 0, sizeof(struct sockaddr_in));
+        sockAddresses[i].sin_family = AF_INET;
+        sockAddresses[i].sin_port = htons(addresses[i].second);
+        if (inet_pton(AF_INET, addresses[i].first.c_str(), &sockAddresses[i].sin_addr) != 1)
+            throw std::invalid_argument("Invalid IPv4 address: " + addresses[i].first);
+    }
+    return sockAddresses;
+}
+
+// Send all packets in order to all addresses. This does not access any python objects, therefore it can run without
+// the GIL. Returns 0 on success or the socket error code.
+int SendPackets(intptr_t fd, const std::vector<PacketData> &packets, const std::vector<struct sockaddr_in> &addresses) {
+    size_t numAddresses = addresses.size();
+    size_t numMessages = packets.size() * numAddresses;
+    if (numMessages == 0)
+        return 0;
+
+#ifdef __linux__
+    // send all packets to all addresses with a single system call
+    std::vector<struct iovec> iovs(packets.size());
+    std::vector<struct mmsghdr> messages(numMessages);
+    for (size_t i = 0; i < packets.size(); i++) {
+        iovs[i].iov_base = packets[i].data;
+        iovs[i].iov_len = packets[i].size;
+
+        for (size_t j = 0; j < numAddresses; j++) {
+            struct mmsghdr *message = &messages[i * numAddresses + j];
+            memset(message, 0, sizeof(struct mmsghdr));
+            message->msg_hdr.msg_name = (void *)&addresses[j];
+            message->msg_hdr.msg_namelen = sizeof(struct sockaddr_in);
+            message->msg_hdr.msg_iov = &iovs[i];
+            message->msg_hdr.msg_iovlen = 1;
+        }
+    }
+
+    size_t numSent = 0;
+    while (numSent < numMessages) {
+        int res = sendmmsg(fd, messages.data() + numSent, numMessages - numSent, 0);
+        if (res < 0) {
+            if (errno == EINTR)
+                continue;
+            return errno;
+        }
+        numSent += res;
+    }
+#else
+    for (size_t i = 0; i < numMessages; i++) {
+        const PacketData &packet = packets[i / numAddresses];
+        if (sendto(fd, (const char *)packet.data, packet.size, 0, (const struct sockaddr *)&addresses[i % numAddresses],
+                   sizeof(struct sockaddr_in)) < 0)
+            return LAST_SOCKET_ERROR;
+    }
+#endif
+
+    return 0;
+}
+
+size_t SendPacketsToAll(intptr_t fd, const std::vector<py::buffer> &packetBuffers, const AddressList &addresses) {
+    // keep the buffer infos alive until all packets are send
+    std::vector<py::buffer_info> infos;
+    std::vector<PacketData> packets;
+    infos.reserve(packetBuffers.size());
+    for (const py::buffer &packetBuffer : packetBuffers) {
+        infos.push_back(packetBuffer.request());
+        packets.push_back({ infos.back().ptr, (size_t)(infos.back().size * infos.back().itemsize) });
+    }
+    std::vector<struct sockaddr_in> sockAddresses = ParseAddresses(addresses);
+
+    int error;
+    {
+        // release the GIL while waiting for the system call
+        py::gil_scoped_release release;
+        error = SendPackets(fd, packets, sockAddresses);
+    }
+
+    if (error)
+        RaiseSocketError(error);
+
+    return packets.size() * sockAddresses.size();
+}
+
+std::vector<int32_t> EncodeAndSendPackets(ALACEncoder *encoder, intptr_t fd, const std::vector<py::buffer> &pcmBuffers,
+                                          uint32_t first_seq, uint32_t first_timestamp, uint32_t device_magic,
+                                          bool is_first, const AddressList &plainAddresses,
+                                          const AddressList &encryptedAddresses, int sample_rate,
+                                          py::object plainOuts, py::object encryptedOuts) {
+    size_t numPackets = pcmBuffers.size();
+    std::vector<py::buffer_info> pcms, plainInfos, encryptedInfos;
+    pcms.reserve(numPackets);
+    plainInfos.reserve(numPackets);
+    encryptedInfos.reserve(numPackets);
+    for (size_t i = 0; i < numPackets; i++) {
+        pcms.push_back(RequestPCMBuffer(encoder, pcmBuffers[i]));
+        plainInfos.push_back(RequestPacketBuffer(encoder, plainOuts.is_none() ? plainOuts : plainOuts[py::int_(i)]));
+        encryptedInfos.push_back(RequestPacketBuffer(encoder, encryptedOuts.is_none() ? encryptedOuts :
+                                                                                        encryptedOuts[py::int_(i)]));
+    }
+
+    // the packets are encoded into the caller owned buffers, which allows keeping them for resend requests
+    if (!plainAddresses.empty() && plainOuts.is_none())
+        throw std::invalid_argument("plain_outs are required to send plain packets.");
+    if (!encryptedAddresses.empty() && encryptedOuts.is_none())
+        throw std::invalid_argument("encrypted_outs are required to send encrypted packets.");
+
+    std::vector<struct sockaddr_in> plainSockAddresses = ParseAddresses(plainAddresses);
+    std::vector<struct sockaddr_in> encryptedSockAddresses = ParseAddresses(encryptedAddresses);
+
+    std::vector<int32_t> sizes(numPackets);
+    int error;
+    {
+        // everything below works on c++ data only, therefore the GIL is not needed
+        py::gil_scoped_release release;
+        std::lock_guard<std::mutex> lock(encoder_mutex);
+
+        std::vector<PacketData> plainPackets, encryptedPackets;
+        plainPackets.reserve(numPackets);
+        encryptedPackets.reserve(numPackets);
+
+        for (size_t i = 0; i < numPackets; i++) {
+            unsigned char *plain = (unsigned char *)plainInfos[i].ptr;
+            unsigned char *encrypted = (unsigned char *)encryptedInfos[i].ptr;
+
+            // consecutive packets differ by one sequence number and by the number of frames per packet in the timestamp
+            size_t size = EncodePacketInto(encoder, (unsigned char *)pcms[i].ptr, pcms[i].size * pcms[i].itemsize,
+                                           plain, encrypted, (first_seq + i) & 0xffff,
+                                           first_timestamp + i * encoder->GetFrameSize(), device_magic,
+                                           is_first && i == 0, sample_rate);
+            sizes[i] = size;
+            if (plain)
+                plainPackets.push_back({ plain, size });
+            if (encrypted)
+                encryptedPackets.push_back({ encrypted, size });
+        }
+
+        error = SendPackets(fd, plainPackets, plainSockAddresses);
+        if (!error)
+            error = SendPackets(fd, encryptedPackets, encryptedSockAddresses);
+    }
+
+    if (error)
+        RaiseSocketError(error);
+
+    return sizes;
 }
 
 
 PYBIND11_MODULE(libalac, m) {
     m.doc() = "Python ALACEncoder bindings.";
 
+    InitAESContext();
+
     py::class_<ALACEncoder> encoder(m, "ALACEncoder");
 
     encoder.def(py::init([](int frames_per_packet)
@@ -106,17 +368,26 @@ PYBIND11_MODULE(libalac, m) {
 
     encoder.def("encode_alac", [](ALACEncoder *encoder, std::vector<unsigned char> pcmData, int sample_rate=kSampleRate)
     {
-        AudioFormatDescription inputFormat, outputFormat;
-        FillInputAudioFormat(&inputFormat, sample_rate);
-        FillOutputAudioFormat(&outputFormat, encoder->GetFrameSize());
-
-        int32_t alacSize = pcmData.size();
-        std::vector<unsigned char> alacData(alacSize);
-
-        encoder->Encode(inputFormat, outputFormat, pcmData.data(), alacData.data(), &alacSize);
-
-        return alacData;
-    }, "Encode PCM data to ALAC data.", py::arg("pcmData"), py::arg("sample_rate")=kSampleRate);
-
-    m.def("encrypt_aes", &EncryptAES, "Encrypt alac data with an aes key.", py::arg("alacData"));
+        return EncodeALAC(encoder, pcmData, sample_rate);
+    }, "Encode PCM data to ALAC data.", py::arg("pcmData"), py::arg("sample_rate")=kSampleRate,
+       py::call_guard<py::gil_scoped_release>());
+
+    encoder.def("send_packets", &EncodeAndSendPackets, "Encode a list of consecutive PCM packets and send them to the "
+                "receivers which require plain and aes encrypted packets. The packets are written into the lists of "
+                "plain and / or aes encrypted packet buffers, which are required for each non empty address list. "
+                "Returns the size of each packet.",
+                py::arg("fd"), py::arg("pcmPackets"), py::arg("first_seq"), py::arg("first_timestamp"),
+                py::arg("device_magic"), py::arg("is_first"), py::arg("plain_addresses"),
+                py::arg("encrypted_addresses"), py::arg("sample_rate")=kSampleRate, py::arg("plain_outs")=py::none(),
+                py::arg("encrypted_outs")=py::none());
+
+    encoder.def_property_readonly("max_packet_size", &MaxPacketSize,
+                                  "Minimum size of the buffers passed to send_packets.");
+
+    m.def("encrypt_aes", &EncryptAES, "Encrypt alac data with an aes key.", py::arg("alacData"),
+          py::call_guard<py::gil_scoped_release>());
+
+    m.def("send_packets_to_all", &SendPacketsToAll, "Send multiple udp packets in order to multiple (ip, port) "
+          "addresses. On Linux a single sendmmsg system call is used.", py::arg("fd"), py::arg("packets"),
+          py::arg("addresses"));
 }
@@ -1,25 +1,40 @@
 import os
 import sys
+import asyncio
 import logging
+from functools import partial
+
+import qasync
 
 import keyring
 from PyQt5.QtWidgets import QApplication, QListView, QHBoxLayout, QVBoxLayout, QMainWindow, QWidget, QPushButton, \
     QFileDialog, QInputDialog, QLineEdit
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from qasync import asyncSlot
 
 from raopy import RAOPPlayGroup, RAOPServiceListener, STATUS
 from raopy.exceptions import DeviceAuthenticationRequiresPasswordError, DeviceAuthenticationWrongPasswordError, \
     DeviceAuthenticationRequiresPinCodeError, DeviceAuthenticationPairingError, RTSPRequestTimeoutError, \
     DeviceAuthenticationWrongPinCodeError, DeviceAuthenticationError
-from raopy.util import set_logs_enabled, set_loglevel, LOG
+from raopy.util import configure_logs, LOG
 
 # enable only the most basic logs
-set_logs_enabled(LOG.GROUP | LOG.RTSP)
-set_loglevel(LOG.ALL, logging.DEBUG)
+configure_logs(LOG.GROUP | LOG.RTSP, logging.DEBUG)
+
+logger = logging.getLogger("AirplayGUILogger")
+
+# keychain service name to store the credentials for Apple TVs
+KEYCHAIN = "Pygroup"
 
 
 class AirplayGUI(QApplication):
+    # the service listener runs on a background thread, these signals move its events to the gui thread
+    player_connected = pyqtSignal(object)
+    player_disconnected = pyqtSignal(object)
+    # the playback events are fired on the executor threads, which run the play, pause and stop requests
+    play_status_changed = pyqtSignal(str)
+
     def __init__(self, *args, **kwargs):
         super(AirplayGUI, self).__init__(*args, **kwargs)
 
@@ -49,55 +64,97 @@ class AirplayGUI(QApplication):
         bt_widget.setLayout(bt_container)
 
         load_bt = QPushButton("load")
-        play_bt = QPushButton("play")
-        stop_bt = QPushButton("stop")
+        self.play_bt = QPushButton("play")
+        self.stop_bt = QPushButton("stop")
 
         load_bt.clicked.connect(self.load)
-        play_bt.clicked.connect(self.toggle_play_pause)
-        stop_bt.clicked.connect(self.stop)
+        self.play_bt.clicked.connect(self.toggle_play_pause)
+        self.stop_bt.clicked.connect(self.stop)
 
         bt_container.addWidget(load_bt)
-        bt_container.addWidget(play_bt)
-        bt_container.addWidget(stop_bt)
+        bt_container.addWidget(self.play_bt)
+        bt_container.addWidget(self.stop_bt)
         boxlayout.addWidget(bt_widget)
 
+        # add and remove the list entries on the gui thread
+        self.player_connected.connect(self.add_player_item)
+        self.player_disconnected.connect(self.remove_player_item)
+
         # listen for new Airplay devices
         self.listener = RAOPServiceListener()
         self.listener.start_listening()
         self.listener.on_connect += self.connect_player
         self.listener.on_disconnect += self.disconnect_player
 
-        # change the button text according to the current status
+        # change the button text according to the current status on the gui thread
+        self.play_status_changed.connect(self.play_bt.setText)
         self.raop_group = RAOPPlayGroup("default_group")
-        self.raop_group.on_pause += lambda *args: play_bt.setText("play")
-        self.raop_group.on_play += lambda *args: play_bt.setText("pause")
-        self.raop_group.on_stop += lambda *args: play_bt.setText("play")
+        self.raop_group.on_pause += lambda *args: self.play_status_changed.emit("play")
+        self.raop_group.on_play += lambda *args: self.play_status_changed.emit("pause")
+        self.raop_group.on_stop += lambda *args: self.play_status_changed.emit("play")
 
         self.music_file = None
 
+        # list item for each receiver in the list view
+        self._item_by_player = {}
+        # all receivers which are checked in the list view
+        self._checked_players = set()
+        # newly found receivers which are not yet added to the list view
+        self._pending_players = []
+
+        # credentials of each receiver, to avoid querying the keychain over and over again
+        self._credentials = {}
+
         # show the list
         main.setLayout(boxlayout)
         self.win.setCentralWidget(main)
         self.win.show()
 
-    def toggle_play_pause(self, *args):
+    @staticmethod
+    def run_in_background(func, *args, **kwargs):
+        """
+        Run a blocking function (e.g. an RTSP request) in the default executor, to keep the GUI responsive.
+        :param func: function to call
+        :return: awaitable future with the result of the function
+        """
+        return asyncio.get_event_loop().run_in_executor(None, partial(func, *args, **kwargs))
+
+    async def run_playback_request(self, func, *args):
+        """
+        Run a play, pause, resume or stop request in the background. The playback buttons are disabled until the
+        request finished, this way two requests can not change the status of the play group at the same time.
+        :param func: function to call
+        """
+        self.play_bt.setEnabled(False)
+        self.stop_bt.setEnabled(False)
+        try:
+            await self.run_in_background(func, *args)
+        finally:
+            self.play_bt.setEnabled(True)
+            self.stop_bt.setEnabled(True)
+
+    @asyncSlot()
+    async def toggle_play_pause(self, *args):
         """
         Play or resume the stream depending on its status.
         """
         if self.raop_group.status == STATUS.PLAYING:
-            self.raop_group.pause()
+            await self.run_playback_request(self.raop_group.pause)
         elif self.raop_group.status == STATUS.PAUSED:
-            self.raop_group.resume()
+            await self.run_playback_request(self.raop_group.resume)
         elif self.raop_group.status == STATUS.STOPPED and self.music_file:
-            self.raop_group.play(self.music_file)
+            await self.run_playback_request(self.raop_group.play, self.music_file)
 
-    def stop(self, *args):
+    @asyncSlot()
+    async def stop(self, *args):
         """
         Stop the stream.
         """
-        self.raop_group.stop()
+        # stopping sends a TEARDOWN request to each receiver
+        await self.run_playback_request(self.raop_group.stop)
 
-    def load(self, *args):
+    @asyncSlot()
+    async def load(self, *args):
         """
         Load a new file which should be streamed.
         """
@@ -109,11 +166,34 @@ class AirplayGUI(QApplication):
             # save the path to the selected music file
             self.music_file = file_name
 
-            # add all currently selected players to the stream
-            for i in range(self.model.rowCount()):
-                item = self.model.item(i)
-                if item.checkState() == Qt.Checked:
-                    self.add_receiver(item.player)
+            # add all currently selected players to the stream (the handshakes run concurrently)
+            await asyncio.gather(*[self.add_receiver(player) for player in self._checked_players])
+
+    def get_credentials(self, receiver):
+        """
+        Load the saved credentials for a receiver from the keychain. The keychain is only queried once per receiver.
+        :param receiver: receiver instance
+        :return: tuple with auth identifier and auth secret or None
+        """
+        credentials = self._credentials.get(receiver.name)
+        if credentials:
+            return credentials
+
+        auth_data = keyring.get_password(KEYCHAIN, receiver.name)
+        if auth_data:
+            credentials = tuple(auth_data.split(":"))
+            self._credentials[receiver.name] = credentials
+        return credentials
+
+    def save_credentials(self, receiver, auth_identifier, auth_secret):
+        """
+        Save new credentials for a receiver to the keychain.
+        :param receiver: receiver instance
+        :param auth_identifier: auth identifier
+        :param auth_secret: auth secret
+        """
+        keyring.set_password(KEYCHAIN, receiver.name, "{0}:{1}".format(auth_identifier, auth_secret))
+        self._credentials[receiver.name] = (auth_identifier, auth_secret)
 
     def show_password_prompt(self, title="", message=""):
         """
@@ -124,14 +204,14 @@ class AirplayGUI(QApplication):
             return text
         return None
 
-    def add_receiver(self, receiver):
+    async def add_receiver(self, receiver):
         """
         Try to add a device to the current playback session.
         :param receiver: receiver to add
         :return: True on success, False otherwise
         """
         try:
-            return self.raop_group.add_receiver(receiver)
+            return await self.run_in_background(self.raop_group.add_receiver, receiver)
         # requiere password
         except DeviceAuthenticationRequiresPasswordError:
 
@@ -146,7 +226,7 @@ class AirplayGUI(QApplication):
 
                     # user did enter a password
                     if pwd:
-                        return self.raop_group.add_receiver(receiver, password=pwd)
+                        return await self.run_in_background(self.raop_group.add_receiver, receiver, password=pwd)
                 except (DeviceAuthenticationWrongPasswordError, RTSPRequestTimeoutError):
                     # wrong password or the connection timed out
                     continue
@@ -154,41 +234,43 @@ class AirplayGUI(QApplication):
         # authentication required by TvOS >= 10.2
         except DeviceAuthenticationRequiresPinCodeError:
 
-            # connect with a pin code
-            keychain = "Pygroup"
             # check if we already got credentials for this device
-            auth_data = keyring.get_password(keychain, receiver.name)
-            if auth_data:
-                auth_identifier, auth_secret = auth_data.split(":")
-                return self.raop_group.add_receiver(receiver, credentials=(auth_identifier, auth_secret))
-            else:
-                while True:
-                    try:
-                        # request a pin code an generate credentials for this device
-                        self.raop_group.request_pincode_for_device(receiver)
-                    except (DeviceAuthenticationPairingError, RTSPRequestTimeoutError):
-                        # pairing request failed... lets try again
-                        continue
-
-                    pin = self.show_password_prompt(title=".",
-                                                    message="Enter the pin for {0}".format(receiver.hostname))
-                    # cancel button clicked
-                    if pin is None:
-                        return False
+            credentials = self.get_credentials(receiver)
+            if credentials:
+                try:
+                    return await self.run_in_background(self.raop_group.add_receiver, receiver,
+                                                        credentials=credentials)
+                except DeviceAuthenticationError:
+                    # the saved credentials are not valid anymore, pair the device again
+                    self._credentials.pop(receiver.name, None)
 
-                    try:
-                        # create new credentials
-                        auth_identifier, auth_secret = self.raop_group.request_login_credentials_for_device_(receiver,
-                                                                                                             pin)
-                        # save the credentials if we are able to connect using them
-                        con = self.raop_group.add_receiver(receiver, credentials=(auth_identifier, auth_secret))
-                        if con:
-                            keyring.set_password(keychain, self.raop_group.name,
-                                                 "{0}:{1}".format(auth_identifier, auth_secret))
-                        return con
-                    except (DeviceAuthenticationError, DeviceAuthenticationWrongPinCodeError, RTSPRequestTimeoutError):
-                        # authentication failed, let's try this again
-                        continue
+            while True:
+                try:
+                    # request a pin code an generate credentials for this device
+                    await self.run_in_background(self.raop_group.request_pincode_for_device, receiver)
+                except (DeviceAuthenticationPairingError, RTSPRequestTimeoutError):
+                    # pairing request failed... lets try again
+                    continue
+
+                pin = self.show_password_prompt(title=".",
+                                                message="Enter the pin for {0}".format(receiver.hostname))
+                # cancel button clicked
+                if pin is None:
+                    return False
+
+                try:
+                    # create new credentials
+                    auth_identifier, auth_secret = await self.run_in_background(
+                        self.raop_group.request_login_credentials_for_device_, receiver, pin)
+                    # save the credentials if we are able to connect using them
+                    con = await self.run_in_background(self.raop_group.add_receiver, receiver,
+                                                       credentials=(auth_identifier, auth_secret))
+                    if con:
+                        self.save_credentials(receiver, auth_identifier, auth_secret)
+                    return con
+                except (DeviceAuthenticationError, DeviceAuthenticationWrongPinCodeError, RTSPRequestTimeoutError):
+                    # authentication failed, let's try this again
+                    continue
 
         # the request to connect the device timed out ... just give up
         except RTSPRequestTimeoutError:
@@ -196,19 +278,23 @@ class AirplayGUI(QApplication):
 
         return False
 
-    def checkStateChanged(self, item):
+    @asyncSlot(QStandardItem)
+    async def checkStateChanged(self, item):
         """
         Called when a listview item is checkd.
         :param item: checked listview item
         """
         # add a device to the current playback if it is checked
-        print("check....")
-        if item.checkState() == Qt.Checked:
-            if not self.add_receiver(item.player):
-                print("uncheck")
+        state = item.checkState()
+        if state == Qt.Checked:
+            self._checked_players.add(item.player)
+            if not await self.add_receiver(item.player):
+                logger.debug("Could not connect to %s. Unchecking the receiver.", item.player)
                 item.setCheckState(Qt.Unchecked)
-        elif item.checkState() == Qt.Unchecked:
-            self.raop_group.remove_receiver(item.player)
+        elif state == Qt.Unchecked:
+            self._checked_players.discard(item.player)
+            # removing a receiver sends a TEARDOWN request
+            await self.run_in_background(self.raop_group.remove_receiver, item.player)
 
     def connect_player(self, player, name, info):
         """
@@ -217,11 +303,7 @@ class AirplayGUI(QApplication):
         :param name: service name
         :param info: additional device information
         """
-        # try to extract name from server name
-        item = QStandardItem(player.hostname)
-        item.player = player
-        item.setCheckable(True)
-        self.model.appendRow(item)
+        self.player_connected.emit(player)
 
     def disconnect_player(self, player, name, info):
         """
@@ -230,15 +312,54 @@ class AirplayGUI(QApplication):
         :param name: service name
         :param info: additional device information
         """
-        for i in range(self.model.rowCount()):
-            item = self.model.item(i)
-            if item.player == player:
-                # remove current player from stream
-                self.raop_group.remove_receiver(item.player)
-                # remove the entry
-                self.model.removeRow(i)
-                break
+        # remove current player from stream
+        self.raop_group.remove_receiver(player)
+        self.player_disconnected.emit(player)
+
+    def add_player_item(self, player):
+        """
+        Add a list entry for a player. Devices are often found in bursts, therefore new entries are collected for a
+        short time and inserted at once.
+        :param player: raop player instance
+        """
+        self._pending_players.append(player)
+        if len(self._pending_players) == 1:
+            QTimer.singleShot(50, self.flush_pending_players)
+
+    def flush_pending_players(self):
+        """
+        Insert all pending players into the list with a single model update.
+        """
+        players, self._pending_players = self._pending_players, []
+
+        items = []
+        for player in players:
+            # try to extract name from server name
+            item = QStandardItem(player.hostname)
+            item.player = player
+            item.setCheckable(True)
+            self._item_by_player[player] = item
+            items.append(item)
+
+        self.model.invisibleRootItem().appendRows(items)
+
+    def remove_player_item(self, player):
+        """
+        Remove the list entry of a player.
+        :param player: raop player instance
+        """
+        self._checked_players.discard(player)
+        self._pending_players = [p for p in self._pending_players if p is not player]
+
+        item = self._item_by_player.pop(player, None)
+        if item:
+            self.model.removeRow(item.row())
 
 
 app = AirplayGUI(sys.argv)
-app.exec_()
+
+# run the asyncio event loop on top of the qt event loop
+loop = qasync.QEventLoop(app)
+asyncio.set_event_loop(loop)
+with loop:
+    loop.run_forever()
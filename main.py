@@ -1,33 +1,42 @@
 import logging
 from time import sleep
 from getpass import getpass
+from threading import Event
 
 import keyring
 
 from raopy import RAOPPlayGroup, RAOPServiceListener, STATUS
-from raopy.util import set_logs_enabled, set_loglevel, LOG
+from raopy.util import configure_logs, LOG
 from raopy.exceptions import DeviceAuthenticationRequiresPasswordError, DeviceAuthenticationRequiresPinCodeError, \
     DeviceAuthenticationWrongPasswordError
 
 # the basic config needs to be enabled for the lowest required loglevel
 #logging.basicConfig(level=logging.DEBUG)
 
-#set_logs_enabled(LOG.RTSP | LOG.RECEIVER)# | LOG.CONTROL)
-set_logs_enabled(LOG.GROUP | LOG.RTSP)
-set_loglevel(LOG.ALL, logging.DEBUG)
-set_loglevel(LOG.RECEIVER, logging.INFO)
+#configure_logs(LOG.RTSP | LOG.RECEIVER, logging.DEBUG)# | LOG.CONTROL)
+configure_logs(LOG.GROUP | LOG.RTSP, logging.DEBUG)
 
 SHAIRPORT_DEVICE3 = "JonasMacbookpro._raop._tcp.local."
 SHAIRPORT_DEVICE1 = "MacBookPro._raop._tcp.local."
 SHAIRPORT_DEVICE0 = "Wohnzimmer._raop._tcp.local."
 SHAIRPORT_DEVICE2 = "ATV._raop._tcp.local."
 
+# only connect to these devices
+ALLOWED_HOSTS = {SHAIRPORT_DEVICE0, SHAIRPORT_DEVICE1}
+
 
 group = RAOPPlayGroup()
 
+# interval in seconds in which we check if the playback can still continue
+STOP_CHECK_INTERVAL = 1
+
+# set as soon as the playback stopped
+stopped = Event()
+group.on_stop += lambda *args: stopped.set()
+
 
 def add_receiver(device, name, info):
-    if SHAIRPORT_DEVICE0 == name.split("@")[1] or SHAIRPORT_DEVICE1 == name.split("@")[1]:
+    if name.partition("@")[2] in ALLOWED_HOSTS:
         try:
             group.add_receiver(device)
         except DeviceAuthenticationRequiresPasswordError:
@@ -71,7 +80,9 @@ listener.start_listening()
 # listen for new devices for 5 seconds
 sleep(5)
 
-group.play("sample.mp3")
+is_playing = group.play("sample.mp3")
+if not is_playing:
+    print("Could not start the playback.")
 
 # sleep(4)
 # print("Pause it now.")
@@ -89,8 +100,9 @@ group.play("sample.mp3")
 # print("Resume it now.")
 #group.resume()
 
-# play until the track is finished
-while group.status != STATUS.STOPPED:
-    sleep(1)
+# play until the track is finished or no receiver is left
+while is_playing and group.status != STATUS.CLOSED and group.receivers:
+    if stopped.wait(STOP_CHECK_INTERVAL):
+        break
 
 group.close()
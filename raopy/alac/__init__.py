@@ -1,6 +1,6 @@
 """
 Load the C++ bindings for the ALACEncoder.
 """
-from .libalac import ALACEncoder, encrypt_aes
+from .libalac import ALACEncoder, encrypt_aes, send_packets_to_all
 
-__all__ = ["ALACEncoder", "encrypt_aes"]
+__all__ = ["ALACEncoder", "encrypt_aes", "send_packets_to_all"]
@@ -1,10 +1,18 @@
 import os
+import sys
+from array import array
 
 import audiotools
 from audiotools.pcm import FrameList, empty_framelist
 from audiotools.pcmconverter import BufferedPCMReader
 
-from ..config import FRAMES_PER_PACKET
+# libsndfile decodes the pcm data much faster than audiotools
+try:
+    import soundfile
+except ImportError:
+    soundfile = None
+
+from ..config import FRAMES_PER_PACKET, SAMPLING_RATE
 from ..exceptions import UnsupportedFileType
 
 
@@ -29,18 +37,38 @@ class AudioFile(object):
 
         # is the file seekable
         self.seekable = self.file.seekable()
-        # the total number of frames in this file
-        self._num_frames = self.file.total_frames()
+        # the total number of frames in this file. Each frame holds the pcm data of a single audio packet.
+        self._num_frames = (self.file.total_frames()+FRAMES_PER_PACKET-1)//FRAMES_PER_PACKET
+
+        # try to decode the file with libsndfile first and fall back to the audiotools pcm reader
+        self._sound_file = self._open_with_soundfile(file_path)
+        if self._sound_file is not None:
+            self._packet_size = FRAMES_PER_PACKET*2*2
+            self._next_frame_number = 0
+            self.seekable = self._sound_file.seekable()
+            if self.seekable:
+                # read the frames of each packet on demand, this way long files are not loaded into memory
+                self._num_frames = (self._sound_file.frames+FRAMES_PER_PACKET-1)//FRAMES_PER_PACKET
+            else:
+                # load the whole file into memory if seeking is not available
+                with self._sound_file:
+                    self._data = self._to_little_endian(self._sound_file.buffer_read(dtype="int16"))
+                self._sound_file = None
+                self._num_frames = (len(self._data)+self._packet_size-1)//self._packet_size
+            return
 
         # create a pcm reader
         pcm = self.file.to_pcm()
         if self.seekable:
             self._pcm = pcm
+            # reusable frame list for the data of a single packet (See: BufferedPCMReader_read)
+            self._frame_list = FrameList(self._pcm, self._pcm.channels, self._pcm.bits_per_sample, FRAMES_PER_PACKET)
         else:
             # load the whole file into memory if seeking is not available
+            self._packet_size = FRAMES_PER_PACKET*pcm.channels*(pcm.bits_per_sample//8)
             self._data = self._load(pcm)
             # Todo: just for debugging
-            self._num_frames = len(self._data)
+            self._num_frames = (len(self._data)+self._packet_size-1)//self._packet_size
 
         # save the last frame number
         self._next_frame_number = 0
@@ -50,21 +78,58 @@ class AudioFile(object):
         If the backend for this file type supports seeking, do nothing. Otherwise try to load the whole file into
         memory. (If you have a better idea let me know...)
         :param pcm: pcmreader instance
+        :return: memoryview of a single contiguous buffer holding the whole pcm stream
         """
         if self.seekable:
             return
 
-        # stores all frames as binary data in a list
-        data = []
+        # stores all frames as binary data in one buffer, the packets are sliced out of it on demand
+        data = bytearray()
         reader = BufferedPCMReader(pcm)
 
-        frame_list = reader.read(FRAMES_PER_PACKET)
+        # read bigger chunks to reduce the number of FrameList objects which need to be created
+        frame_list = reader.read(FRAMES_PER_PACKET*64)
         # Todo: debug to shorten the music file
         while frame_list.frames != 0:
-            data.append(frame_list.to_bytes(False, True))
-            frame_list = reader.read(FRAMES_PER_PACKET)
+            data += frame_list.to_bytes(False, True)
+            frame_list = reader.read(FRAMES_PER_PACKET*64)
+
+        return memoryview(data)
+
+    @staticmethod
+    def _open_with_soundfile(file_path):
+        """
+        Open the file using libsndfile, if it is installed and supports the file.
+        :param file_path: path to audio file
+        :return: soundfile.SoundFile instance or None if libsndfile can not be used
+        """
+        if soundfile is None:
+            return None
+
+        try:
+            f = soundfile.SoundFile(file_path)
+        except RuntimeError:
+            return None
+
+        # the encoder only supports 16 bit stereo at the default sampling rate
+        if f.channels != 2 or f.samplerate != SAMPLING_RATE:
+            f.close()
+            return None
+        return f
+
+    @staticmethod
+    def _to_little_endian(data):
+        """
+        :param data: 16 bit pcm data read by libsndfile
+        :return: memoryview of the 16 bit pcm data in little endian byte order
+        """
+        # the encoder expects little endian samples, libsndfile returns them in the native byte order
+        if sys.byteorder == "big":
+            samples = array("h", bytes(data))
+            samples.byteswap()
+            data = samples.tobytes()
 
-        return data
+        return memoryview(data).cast("B")
 
     def _seek(self, frame_number):
         """
@@ -73,18 +138,28 @@ class AudioFile(object):
         """
         self._next_frame_number = min(max(frame_number, 0), self.total_frames)
 
-        if self.seekable:
-            self._pcm.seek(frame_number)
+        if self._sound_file is not None:
+            self._sound_file.seek(self._next_frame_number*FRAMES_PER_PACKET)
+        elif self.seekable:
+            self._pcm.seek(self._next_frame_number*FRAMES_PER_PACKET)
 
     def _next_frame(self):
         """
         Return the next frame.
         """
-        if self.seekable:
-            # read the right amount of data (See: BufferedPCMReader_read)
-            frame_list = FrameList(self._pcm, self._pcm.channels, self._pcm.bits_per_sample, FRAMES_PER_PACKET);
-            frames_read = self._pcm.read(FRAMES_PER_PACKET)
-            frame_list.frames = frames_read
+        if self._sound_file is not None:
+            data = self._sound_file.buffer_read(FRAMES_PER_PACKET, dtype="int16")
+
+            # reached the end of the stream
+            if len(data) == 0:
+                return None
+
+            self._next_frame_number += 1
+            return self._to_little_endian(data)
+        elif self.seekable:
+            # read the right amount of data into the frame list
+            frame_list = self._frame_list
+            frame_list.frames = self._pcm.read(FRAMES_PER_PACKET)
 
             # reached the end of the stream
             if frame_list.frames == 0:
@@ -94,10 +169,12 @@ class AudioFile(object):
             return frame_list.to_bytes(False, True)
         else:
             # reached the end of the frame_list
-            if self._next_frame_number >= len(self._data):
+            if self._next_frame_number >= self._num_frames:
                 return None
 
-            frame_data = self._data[self._next_frame_number]
+            # slicing the memoryview does not copy the pcm data
+            start = self._next_frame_number*self._packet_size
+            frame_data = self._data[start:start+self._packet_size]
             self._next_frame_number += 1
             return frame_data
 
@@ -112,7 +189,7 @@ class AudioFile(object):
         """
         Get the pcm frame data at the given number from the framelist.
         :param frame_number: frame number
-        :return: frame data in bytes
+        :return: frame data as bytes or as memoryview if the file was loaded into memory
         """
         # play silence if the frame number is smaller than 0
         if frame_number < 0:
@@ -125,6 +202,16 @@ class AudioFile(object):
         self._seek(frame_number)
         return self._next_frame()
 
+    def close(self):
+        """
+        Close the file handles. The audio file can not be read afterwards.
+        """
+        if self._sound_file is not None:
+            self._sound_file.close()
+            self._sound_file = None
+        elif self.seekable:
+            self._pcm.close()
+
     def supports_metadata(self):
         """
         :return: True if the metadata can be extracted, False otherwise
@@ -2,22 +2,39 @@
 Sync audio playback information across connected devices by sending the audio packets and inform the udp server to send
 corresponding sync packets.
 """
+import os
 import socket
-from threading import Timer, Lock, Event
+from time import monotonic, monotonic_ns
+from logging import getLogger, DEBUG
+from threading import Thread, Lock, Event
 from random import randint
 
 from ..rtp import rtp_timestamp_for_seq
 from ..rtsp import RAOPCrypto
-from ..audio.audiopacket import AudioPacket
-from ..alac import ALACEncoder, encrypt_aes
-from ..config import SAMPLING_RATE, FRAMES_PER_PACKET, STREAM_LATENCY, SYNC_PERIOD, RAOP_FRAME_LATENCY, RAOP_LATENCY_MIN
-from ..util import milliseconds_since_1970, EventHook, random_int
+from ..alac import ALACEncoder, send_packets_to_all
+from ..config import SAMPLING_RATE, FRAMES_PER_PACKET, STREAM_LATENCY, SYNC_PERIOD, RAOP_FRAME_LATENCY, \
+    RAOP_LATENCY_MIN, SEQ_PER_MS_NUM, SEQ_PER_MS_DEN, SEQ_PER_NS_DEN, AUDIO_THREAD_CPU, AUDIO_THREAD_PRIORITY
+from ..util import EventHook, random_int
 
 from .audiofile import AudioFile
+from .pcmprefetcher import PCMPrefetcher
 
 
+# the audio packets are logged by the receiver logger (LOG.RECEIVER)
+audio_logger = getLogger("RAOPReceiverLogger")
+
 SYNC_AUDIO_THREAD_NAME = "raopy-sync_audio-thread"
 
+# maximum time to wait for the prefetcher before the stream starts (in seconds)
+PCM_PREFETCH_TIMEOUT = 1
+
+# maximum number of audio packets of a burst which are encoded and send with a single call to the encoder
+SEND_BATCH_PACKETS = 32
+
+# number of send audio packets which are kept for resend requests. This must be a power of two, which is larger than the
+# sequence latency, this way each 16 bit sequence number is mapped to a fixed slot of the cache.
+RESEND_CACHE_PACKETS = 512
+
 
 def seq_num_to_ms(seq_num):
     """
@@ -25,7 +42,7 @@ def seq_num_to_ms(seq_num):
     :param seq_num: sequence number to convert
     :return: milliseconds
     """
-    return seq_num * (FRAMES_PER_PACKET * 1000) / SAMPLING_RATE
+    return seq_num * SEQ_PER_MS_DEN / SEQ_PER_MS_NUM
 
 
 def ms_to_seq_num(millisec):
@@ -34,7 +51,16 @@ def ms_to_seq_num(millisec):
     :param millisec: milliseconds
     :return: sequence number
     """
-    return millisec * SAMPLING_RATE // (FRAMES_PER_PACKET * 1000)
+    return millisec * SEQ_PER_MS_NUM // SEQ_PER_MS_DEN
+
+
+def ns_to_seq_num(nanosec):
+    """
+    Convert nanoseconds to a sequence number using integer arithmetic only.
+    :param nanosec: nanoseconds
+    :return: sequence number
+    """
+    return nanosec * SEQ_PER_MS_NUM // SEQ_PER_NS_DEN
 
 
 class AudioSync(object):
@@ -65,9 +91,15 @@ class AudioSync(object):
 
         # current audio file
         self.audio_file = None
+        # reads the pcm data of the audio file ahead of time while streaming
+        self._prefetcher = None
 
         # save a reference (no copy!) to the devices and the udp sever
         self._receivers = receivers
+        # immutable copy of the receivers together with their plain and encrypted addresses, which is used to send the
+        # audio packets. Call refresh_receivers each time the receivers change. Replacing the tuple is atomic, therefore
+        # the audio thread does not need a lock to read it.
+        self._receivers_snapshot = self._create_snapshot(receivers)
 
         # set a random sequence number which is always greater then the smallest latency possible => next_seq >= 0
         self.start_seq = 0#randint(self.sequence_latency, 0xffff)
@@ -78,12 +110,13 @@ class AudioSync(object):
         # sequence number of next packet to send
         self.next_seq = self.ref_seq
 
-        # set to the current milliseconds since 1970 each time the stream starts / resumes playback
+        # set to the current monotonic clock value in nanoseconds each time the stream starts / resumes playback
         # this is needed to calculate the number of packets we need to send on a burst
         self.burst_time_ref = None
 
-        # audio sync timer
-        self.timer = None
+        # audio sync thread and the event to stop it
+        self._sync_thread = None
+        self._stop_event = None
 
         # device magic for audio packet
         self._device_magic = random_int(9)
@@ -96,10 +129,68 @@ class AudioSync(object):
 
         # encoder instance for alac encoder
         self._encoder = ALACEncoder(frames_per_packet=FRAMES_PER_PACKET)
-
-        # make accessing the next sequence number thread save
+        # the encoder and the resend cache are shared by the audio thread and resend requests
+        self._encode_lock = Lock()
+
+        # the audio thread encodes the packets directly into these buffers and keeps them for resend requests
+        self._resend_plain_views = [memoryview(bytearray(self._encoder.max_packet_size))
+                                    for _ in range(RESEND_CACHE_PACKETS)]
+        self._resend_encrypted_views = [memoryview(bytearray(self._encoder.max_packet_size))
+                                        for _ in range(RESEND_CACHE_PACKETS)]
+        # 16 bit sequence number, size and the availability of the plain and the encrypted packet for each slot
+        self._resend_cache = [None]*RESEND_CACHE_PACKETS
+
+        # held by the audio thread while it sends a burst, which allows waiting for the end of the current burst
         self._next_seq_lock = Lock()
 
+    def refresh_receivers(self):
+        """
+        Update the copy of the receivers used by the audio thread. This must be called after a receiver was added or
+        removed.
+        """
+        self._receivers_snapshot = self._create_snapshot(self._receivers)
+
+    @classmethod
+    def _create_snapshot(cls, receivers):
+        """
+        :param receivers: list of receivers
+        :return: tuple of the receivers, the addresses of the receivers which require plain packets and the addresses
+        of the receivers which require encrypted packets
+        """
+        receivers = tuple(receivers)
+        plain_addresses, encrypted_addresses = cls._split_addresses(receivers)
+        return receivers, plain_addresses, encrypted_addresses
+
+    # region pcm prefetching
+    def _start_prefetcher(self, frame_number):
+        """
+        Start reading the pcm data in the background beginning with the given frame.
+        :param frame_number: relative number of the first frame to read
+        """
+        self._stop_prefetcher()
+        self._prefetcher = PCMPrefetcher(self.audio_file, frame_number)
+        self._prefetcher.start()
+
+    def _stop_prefetcher(self):
+        """
+        Stop reading the pcm data in the background.
+        """
+        if self._prefetcher:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+    def _prefetcher_at(self, frame_number):
+        """
+        Get a prefetcher whose next frame is the given one. Consecutive frames can be read with its get_frame method.
+        :param frame_number: relative frame number
+        :return: PCMPrefetcher instance
+        """
+        # restart the prefetcher if the stream jumped to another position
+        if not self._prefetcher or self._prefetcher.next_frame != frame_number:
+            self._start_prefetcher(frame_number)
+        return self._prefetcher
+    # endregion
+
     # region open / close socket
     def open(self):
         """
@@ -151,10 +242,11 @@ class AudioSync(object):
     def current_seq_number(self):
         """
         Get the sequence number of the next frame which should be played
+        Note: This does not wait for the current burst. The audio thread only writes next_seq once at the end of each
+        burst, therefore the returned value is always a consistent snapshot.
         :return: current sequence number
         """
-        with self._next_seq_lock:
-            return self.next_seq
+        return self.next_seq
 
     @property
     def start_seq_number(self):
@@ -171,56 +263,76 @@ class AudioSync(object):
         return (RAOP_FRAME_LATENCY + RAOP_LATENCY_MIN) // FRAMES_PER_PACKET + 2
     # endregion
 
-    def send_packet(self, seq_num, receivers=None, is_resend=False):
+    def resend_packet(self, seq_num, receivers=None):
         """
-        Send a packet over udp
+        Send an already send packet over udp again. The audio file is read by the prefetch thread while streaming,
+        therefore the packet is only taken from the resend cache. The cache covers the whole latency window, older
+        packets would arrive too late to be played anyway and are dropped.
         :param seq_num: sequence number
         :param receivers: list of receivers which should receiver this packet
-        :param is_resend: True if we are resending a packet
+        :return: True if the packet was send, False otherwise
         """
         if not self.is_streaming or not self.audio_file:
             return False
 
-        # use all receivers as default
-        if receivers is None:
-            receivers = self._receivers
-
-        first_packet = (seq_num == self.ref_seq)# + self.sequence_latency)
-
-        # send a control packet every SYNC_PERIOD number of audio packets (except on a resend)
-        if (seq_num-self.ref_seq) % SYNC_PERIOD == 0 and not is_resend:
-            # inform all listener
-            self.on_need_sync.fire(seq_num, set(receivers), is_first=first_packet)
-
-        # calculate a relative sequence number between 0 and #(Frames in audio file)
-        # this can be smaller than zero, e.g. if we pause on second 1 and subtract the latency of ~2 seconds
-        relative_seq = self.next_seq - self.start_seq
-        # encode pcm raw data to alac data
-        pcm_data = self.audio_file.get_frame(relative_seq)
+        if self._resend_cached_packet(seq_num, receivers):
+            if audio_logger.isEnabledFor(DEBUG):
+                audio_logger.debug("Resend audio packet: %s", seq_num)
+            return True
 
-        # reached the end of the stream... we only support one track (at the moment) => close the connection
-        if not pcm_data:
-            self.on_stream_ended.fire(min(seq_num, self.total_seq_number))
-            return False
+        if audio_logger.isEnabledFor(DEBUG):
+            audio_logger.debug("Drop resend request for audio packet %s, which is not cached anymore.", seq_num)
+        return False
 
-        alac_data = self._encoder.encode_alac(pcm_data, sample_rate=SAMPLING_RATE)
+    def _resend_cached_packet(self, seq_num, receivers=None):
+        """
+        Send a packet from the resend cache to the receivers.
+        :param seq_num: sequence number
+        :param receivers: list of receivers which should receiver this packet
+        :return: True if the packet was send, False if it is not cached anymore
+        """
+        if receivers is None:
+            receivers, plain_addresses, encrypted_addresses = self._receivers_snapshot
+        else:
+            plain_addresses, encrypted_addresses = self._split_addresses(dict.fromkeys(receivers))
+
+        slot = seq_num & (RESEND_CACHE_PACKETS - 1)
+        with self._encode_lock:
+            entry = self._resend_cache[slot]
+            if not entry or entry[0] != seq_num & 0xFFFF:
+                return False
+
+            _, size, has_plain, has_encrypted = entry
+            # the packet was send before a receiver with another encryption type was added
+            if (plain_addresses and not has_plain) or (encrypted_addresses and not has_encrypted):
+                return False
+
+            fileno = self._audio_socket.fileno()
+            if plain_addresses:
+                send_packets_to_all(fileno, [self._resend_plain_views[slot][:size]], plain_addresses)
+            if encrypted_addresses:
+                send_packets_to_all(fileno, [self._resend_encrypted_views[slot][:size]], encrypted_addresses)
+        return True
 
-        # packet rtp timestamp
-        timestamp = rtp_timestamp_for_seq(seq_num)
+    @staticmethod
+    def _split_addresses(receivers):
+        """
+        :param receivers: list of receivers
+        :return: addresses of the receivers which require plain packets and of those which require encrypted packets
+        """
+        # use RSA encryption if the device supports it
+        plain_addresses = []
+        encrypted_addresses = []
+        for receiver in receivers:
+            # the server port is only known after the rtsp handshake of the receiver finished
+            if not receiver.server_port:
+                continue
 
-        # send the audio packet to each device
-        for receiver in set(receivers):
-            # use RSA encryption if the device supports it
             if receiver.encryption_type & RAOPCrypto.RSA:
-                alac_data = encrypt_aes(alac_data)
-
-            # create the audio packet and instruct each device to send it over its udp connection
-            packet = AudioPacket(seq_num, alac_data, timestamp, self._device_magic, is_first=first_packet)
-            self._audio_socket.sendto(packet.to_data(), (receiver.ip, receiver.server_port))
-            if is_resend:
-                print("send audio packet: ", seq_num, " is_first: ", first_packet)
-
-        return True
+                encrypted_addresses.append((receiver.ip, receiver.server_port))
+            else:
+                plain_addresses.append((receiver.ip, receiver.server_port))
+        return plain_addresses, encrypted_addresses
 
     # region start/stop streaming
     def load_audio(self, file_path):
@@ -229,11 +341,21 @@ class AudioSync(object):
         :param file_path: path to the audio file
         """
         # create an audio file to read the pcm data
+        self._close_audio_file()
         self.audio_file = AudioFile(file_path)
 
         # set the next audio packet sequence number to the start number
         self.next_seq = self.start_seq
 
+    def _close_audio_file(self):
+        """
+        Stop reading ahead and close the current audio file.
+        """
+        self._stop_prefetcher()
+        if self.audio_file:
+            self.audio_file.close()
+            self.audio_file = None
+
     def start_streaming(self, seq=None):
         """
         Start streaming the music file at a specific sequence. Do not include the latency in this sequence number!
@@ -251,13 +373,24 @@ class AudioSync(object):
         self.ref_seq = seq# - self.sequence_latency
         self.next_seq = self.ref_seq
 
+        # the sequence numbers are reused after a pause, drop the packets of the last stream
+        with self._encode_lock:
+            self._resend_cache = [None]*RESEND_CACHE_PACKETS
+
+        # start decoding the audio data before the first burst is send and give the prefetcher a head start, otherwise
+        # the first bursts would need to wait for the decoder while the playback time is already running
+        self._start_prefetcher(self.next_seq - self.start_seq)
+        self._prefetcher.wait_until_filled(timeout=PCM_PREFETCH_TIMEOUT)
+
         # update the last burst timestamp
-        self.burst_time_ref = milliseconds_since_1970()
+        self.burst_time_ref = monotonic_ns()
 
-        # start sending audio in a background thread
-        self.timer = Timer(0, self.sync_audio)
-        self.timer.name = SYNC_AUDIO_THREAD_NAME
-        self.timer.start()
+        # start sending audio in a background thread. Each thread gets its own stop event, this way a thread which is
+        # still waiting for its next burst can not continue, when the stream is resumed quickly after a pause.
+        self._stop_event = Event()
+        self._sync_thread = Thread(target=self._sync_loop, args=(self._stop_event,), name=SYNC_AUDIO_THREAD_NAME)
+        self._sync_thread.daemon = True
+        self._sync_thread.start()
 
         # inform all listener
         self.on_stream_started.fire(seq)
@@ -282,14 +415,21 @@ class AudioSync(object):
 
         self.is_streaming = False
 
-        # cancel the timer
-        if self.timer:
-            self.timer.cancel()
-            self.timer = None
+        # stop the audio sync thread
+        if self._stop_event:
+            self._stop_event.set()
+            self._stop_event = None
+            self._sync_thread = None
+
+        # wait until the audio thread finished its current burst, afterwards the stream is paused
+        with self._next_seq_lock:
+            current_seq = self.next_seq
 
         # inform all listeners that the stream paused
-        # current_seq_number is thread safe, therefore the stream will be paused when we reach this part
-        self.on_stream_paused.fire(self.current_seq_number)
+        self.on_stream_paused.fire(current_seq)
+
+        # the audio thread is done with the current burst, therefore we can stop reading ahead
+        self._stop_prefetcher()
 
         self.next_seq -= self.sequence_latency
 
@@ -306,7 +446,7 @@ class AudioSync(object):
         # inform the listeners about the stop with the correct unmodified seq number
         self.on_stream_stopped.fire(self.current_seq_number)
 
-        self.audio_file = None
+        self._close_audio_file()
 
         # reset the playback progress and ref_seq
         self.next_seq = self.start_seq
@@ -325,34 +465,162 @@ class AudioSync(object):
 
         self.next_seq = new_seq
 
+    def _sync_loop(self, stop_event):
+        """
+        Send a burst of audio packets every STREAM_LATENCY seconds until the stop event is set.
+        :param stop_event: event to stop this loop
+        """
+        self._configure_sync_thread()
+
+        next_burst = monotonic()
+        while not stop_event.is_set():
+            # the stream was paused, stopped or reached its end
+            try:
+                if not self.sync_audio():
+                    break
+            except OSError as e:
+                # keep the stream running, otherwise the thread would end silently while is_streaming is still set
+                audio_logger.error("Could not send the audio burst: %s", e)
+
+            # the next burst is scheduled relative to the last one (and not to the current time) to prevent a drift
+            next_burst += STREAM_LATENCY
+            stop_event.wait(max(0, next_burst - monotonic()))
+
+    @staticmethod
+    def _configure_sync_thread():
+        """
+        Pin the calling thread to a single cpu core and raise its scheduling priority if this is enabled in the config.
+        Streaming continues with the default scheduling if the platform or the permissions do not allow the change.
+        """
+        # the pid 0 refers to the calling thread
+        if AUDIO_THREAD_CPU is not None and hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, {AUDIO_THREAD_CPU})
+            except OSError:
+                pass
+
+        if AUDIO_THREAD_PRIORITY is not None and hasattr(os, "sched_setscheduler"):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(AUDIO_THREAD_PRIORITY))
+            except OSError:
+                pass
+
     def sync_audio(self):
         """
-        Callback to repeatably send audio.
+        Send all audio packets which are due.
+        :return: True if the streaming should continue, False otherwise
         """
         if not self.is_streaming:
-            return
+            return False
 
         # Each time sync_audio runs, a burst of packet is sent. Increasing config.stream_latency lowers CPU usage
         # but increases the size of the burst. If the burst size exceeds the UDP windows size packets are lost.
         # Each time the stream is paused and resume, we need to adjust the burst_time_ref, to guarantee that the right
         # amount of packets is send.
-        elapsed = milliseconds_since_1970() - self.burst_time_ref
+        elapsed = monotonic_ns() - self.burst_time_ref
         # current_seq is the number of the packet we should be sending now. We have some packets to catch-up since
         # sync_audio is not always running. As the first packet send has the number self.ref_seq, we need to add the
         # delta value to this start value.
-        current_seq = self.ref_seq + ms_to_seq_num(elapsed)
+        current_seq = self.ref_seq + ns_to_seq_num(elapsed)
 
         # make sure that the next sequence number is updated before another thread can read it
         with self._next_seq_lock:
-            # Send all packets up to the current one and increase the next sequence number thereby
-            for i in range(self.next_seq, current_seq):
-                    # interrupt streaming if the stream was paused or stopped or some other error occured
-                    if self.send_packet(i):
-                        self.next_seq += 1
-                    else:
-                        return
-
-        # schedule next sync event
-        self.timer = Timer(STREAM_LATENCY, self.sync_audio)
-        self.timer.name = SYNC_AUDIO_THREAD_NAME
-        self.timer.start()
+            # interrupt streaming if the stream was paused or stopped
+            if not self.is_streaming or not self.audio_file:
+                return False
+
+            # nothing to send yet
+            if current_seq <= self.next_seq:
+                return True
+
+            # Send all packets up to the current one and increase the next sequence number thereby. The attributes
+            # are copied to local variables, because a burst can contain thousands of packets after a pause.
+            next_seq = self.next_seq
+            ref_seq = self.ref_seq
+            device_magic = self._device_magic
+            # the rtp timestamp of consecutive packets increases by the number of frames per packet
+            timestamp = rtp_timestamp_for_seq(next_seq)
+            # the frames of a burst are consecutive, therefore the prefetcher only needs to be checked once
+            get_pcm_frame = self._prefetcher_at(next_seq - self.start_seq).get_frame
+            send_packets = self._encoder.send_packets
+            fileno = self._audio_socket.fileno()
+            # call the sync handlers directly instead of dispatching through EventHook.fire
+            need_sync_handlers = self.on_need_sync.handlers
+            # a control packet is send every SYNC_PERIOD number of audio packets starting with the reference sequence,
+            # calculate the next of these sequence numbers once instead of checking each packet with a modulo
+            sync_period = SYNC_PERIOD
+            next_sync_seq = next_seq + (ref_seq - next_seq) % sync_period
+            # module constants used for each batch
+            batch_packets = SEND_BATCH_PACKETS
+            frames_per_packet = FRAMES_PER_PACKET
+            sample_rate = SAMPLING_RATE
+
+            # the receivers do not change during a burst
+            receivers, plain_addresses, encrypted_addresses = self._receivers_snapshot
+            # the packets are encoded into the slots of the resend cache
+            has_plain, has_encrypted = bool(plain_addresses), bool(encrypted_addresses)
+            resend_cache = self._resend_cache
+            resend_plain_views = self._resend_plain_views
+            resend_encrypted_views = self._resend_encrypted_views
+            slot_mask = RESEND_CACHE_PACKETS - 1
+
+            # the packets are encoded, encrypted and send in batches of up to SEND_BATCH_PACKETS packets. Each batch
+            # is a single call into the encoder, which does all of the work without holding the GIL.
+            try:
+                with self._encode_lock:
+                    while next_seq < current_seq:
+                        batch_size = min(current_seq - next_seq, batch_packets)
+                        pcm_packets = []
+                        for seq in range(next_seq, next_seq + batch_size):
+                            pcm_data = get_pcm_frame()
+                            # reached the end of the stream
+                            if not pcm_data:
+                                break
+
+                            # send a control packet every SYNC_PERIOD number of audio packets
+                            if seq == next_sync_seq:
+                                for handler in need_sync_handlers:
+                                    handler(seq, receivers, is_first=(seq == ref_seq))
+                                next_sync_seq += sync_period
+                            pcm_packets.append(pcm_data)
+
+                        if not pcm_packets:
+                            break
+
+                        seqs = range(next_seq, next_seq + len(pcm_packets))
+                        slots = [seq & slot_mask for seq in seqs]
+                        plain_outs = [resend_plain_views[slot] for slot in slots] if has_plain else None
+                        encrypted_outs = [resend_encrypted_views[slot] for slot in slots] if has_encrypted else None
+                        try:
+                            sizes = send_packets(fileno, pcm_packets, next_seq & 0xFFFF, timestamp, device_magic,
+                                                 next_seq == ref_seq, plain_addresses, encrypted_addresses,
+                                                 sample_rate, plain_outs, encrypted_outs)
+                        except OSError as e:
+                            # a single unreachable receiver must not end the stream for all other receivers. The
+                            # packets of this batch are lost and can not be resend.
+                            audio_logger.error("Could not send audio packets %s to %s: %s", next_seq,
+                                               next_seq + len(pcm_packets) - 1, e)
+                            for slot in slots:
+                                resend_cache[slot] = None
+                        else:
+                            for seq, slot, size in zip(seqs, slots, sizes):
+                                resend_cache[slot] = (seq & 0xFFFF, size, has_plain, has_encrypted)
+
+                        num_packets = len(pcm_packets)
+                        next_seq += num_packets
+                        timestamp = (timestamp + num_packets*frames_per_packet) & 0xFFFFFFFF
+
+                        # reached the end of the stream
+                        if len(pcm_packets) < batch_size:
+                            break
+            finally:
+                self.next_seq = next_seq
+
+        # reached the end of the stream... we only support one track (at the moment) => close the connection
+        # Note: The listeners are informed after the lock is released, because they usually stop the stream, which
+        # requires the lock.
+        if next_seq < current_seq:
+            self.on_stream_ended.fire(min(next_seq, self.total_seq_number))
+            return False
+
+        return True
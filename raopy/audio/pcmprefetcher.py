@@ -0,0 +1,143 @@
+"""
+Read the pcm data of an audio file ahead of time in a background thread.
+"""
+from collections import deque
+from threading import Thread, Event
+
+from ..config import PCM_PREFETCH_PACKETS
+
+
+PCM_PREFETCH_THREAD_NAME = "raopy-pcm_prefetch-thread"
+
+# interval in seconds in which a waiting consumer checks if the producer thread is still alive
+PRODUCER_CHECK_INTERVAL = 0.1
+
+
+class PCMPrefetcher(object):
+    """
+    Decode the pcm frames of an AudioFile in a background thread and store them in a bounded ring buffer. This way the
+    audio thread does not need to wait for the decoder and only takes the already decoded frames from the buffer.
+    Frames must be requested in order, starting with the frame number passed to the constructor.
+    The buffer is a deque with a single producer and a single consumer. Appending and popping are atomic, therefore
+    no lock is required as long as the buffer is neither empty nor full. Events are only used to wait in these cases.
+    """
+
+    def __init__(self, audio_file, start_frame, max_frames=PCM_PREFETCH_PACKETS):
+        """
+        :param audio_file: AudioFile instance to read from
+        :param start_frame: number of the first frame to read
+        :param max_frames: maximum number of frames to read ahead
+        """
+        self._audio_file = audio_file
+        # number of the frame which is returned by the next call to get_frame
+        self.next_frame = start_frame
+
+        self._frames = deque()
+        self._max_frames = max_frames
+        # wake up the consumer if a frame was added or the producer if a frame was removed
+        self._frame_available = Event()
+        self._space_available = Event()
+        self._stop_event = Event()
+        # set as soon as the buffer is full for the first time or the whole file was read
+        self._filled_event = Event()
+        # set as soon as the consumer reached the end of the stream, every later call to get_frame returns None
+        self._end_of_stream = False
+
+        self._thread = Thread(target=self._run, args=(start_frame,), name=PCM_PREFETCH_THREAD_NAME)
+        self._thread.daemon = True
+
+    def start(self):
+        """
+        Start reading the frames in the background.
+        """
+        self._thread.start()
+
+    def wait_until_filled(self, timeout=None):
+        """
+        Block until the buffer is full or the end of the file is reached.
+        :param timeout: maximum time to wait in seconds
+        :return: True if the buffer was filled, False if the timeout expired
+        """
+        return self._filled_event.wait(timeout)
+
+    def stop(self):
+        """
+        Stop reading frames. The audio file must not be accessed by another thread until this method returns.
+        """
+        self._stop_event.set()
+        self._space_available.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _put(self, pcm_data):
+        """
+        Add a frame to the buffer. Wait until there is space in the buffer, but check regularly if we should stop.
+        :param pcm_data: frame data
+        """
+        frames = self._frames
+        while not self._stop_event.is_set():
+            if len(frames) < self._max_frames:
+                frames.append(pcm_data)
+                self._frame_available.set()
+                if len(frames) >= self._max_frames and not self._filled_event.is_set():
+                    self._filled_event.set()
+                return
+
+            # check again after clearing the event, the consumer might have removed a frame in the meantime
+            self._space_available.clear()
+            if len(frames) >= self._max_frames:
+                self._space_available.wait(0.1)
+
+    def _run(self, frame_number):
+        """
+        Read the frames until the end of the file is reached or the prefetcher is stopped.
+        :param frame_number: number of the first frame to read
+        """
+        try:
+            while not self._stop_event.is_set():
+                pcm_data = self._audio_file.get_frame(frame_number)
+                self._put(pcm_data)
+
+                # reached the end of the stream
+                if not pcm_data:
+                    return
+                frame_number += 1
+        except Exception:
+            # make sure the consumer is not blocked forever if reading the file fails
+            self._put(None)
+            raise
+        finally:
+            self._filled_event.set()
+
+    def get_frame(self):
+        """
+        Get the next frame. This blocks until the frame is read.
+        :return: frame data or None if the end of the file is reached or the producer stopped
+        """
+        if self._end_of_stream:
+            return None
+
+        frames = self._frames
+        while not frames:
+            # check again after clearing the event, the producer might have added a frame in the meantime
+            self._frame_available.clear()
+            if frames:
+                break
+
+            # the producer stopped or failed without adding the end marker. Check the buffer once more, because it
+            # might have added a frame right before it ended.
+            if not self._thread.is_alive():
+                if frames:
+                    break
+                self._end_of_stream = True
+                return None
+
+            self._frame_available.wait(PRODUCER_CHECK_INTERVAL)
+
+        pcm_data = frames.popleft()
+        self._space_available.set()
+        if pcm_data:
+            self.next_frame += 1
+        else:
+            self._end_of_stream = True
+        return pcm_data
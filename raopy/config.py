@@ -1,5 +1,6 @@
 DEFAULT_RTSP_TIMEOUT = 5  # RTSP servers are considered gone if no reply is received before the timeout (in seconds)
 STREAM_LATENCY = 0.05  # audio UDP packets are flushed in bursts periodically (in seconds)
+KEEP_ALIVE_INTERVAL = 30  # receivers which do not reply to a periodic keep alive request are removed (in seconds)
 
 
 # Initialization vector encoded as base64 and encryption key needed for RSA encrypted streaming (ApEx requires this)
@@ -20,3 +21,14 @@ SYNC_PERIOD = 126  # UDP sync packets are sent to all AirTunes devices regularly
 RAOP_FRAME_LATENCY = 2*SAMPLING_RATE
 RAOP_LATENCY_MIN = 11025
 
+# Sequence numbers per millisecond and per nanosecond expressed as integer fractions, which allows converting between
+# time and sequence numbers without floating point arithmetic
+SEQ_PER_MS_NUM = SAMPLING_RATE
+SEQ_PER_MS_DEN = FRAMES_PER_PACKET*1000
+SEQ_PER_NS_DEN = FRAMES_PER_PACKET*1000000000
+
+PCM_PREFETCH_PACKETS = 64  # number of pcm packets which are read ahead of the audio thread
+
+# Optional scheduling of the audio thread to reduce the jitter of the audio bursts (only supported on linux).
+AUDIO_THREAD_CPU = None  # pin the audio thread to this cpu core (None to disable)
+AUDIO_THREAD_PRIORITY = None  # SCHED_FIFO priority of the audio thread, requires root privileges (None to disable)
@@ -19,9 +19,21 @@ from ..exceptions import NoCredentialsError, DeviceAuthenticationError
 
 # region helper methods
 
+# hashers which already consumed the labels used to derive the aes keys and ivs
+_PREFIX_HASHERS = {label: hashlib.sha512(label.encode('utf-8')) for label in
+                   ('Pair-Setup-AES-Key', 'Pair-Setup-AES-IV', 'Pair-Verify-AES-Key', 'Pair-Verify-AES-IV')}
+
+
 def hash_sha512(*indata):
     """Create SHA512 hash for input arguments."""
-    hasher = hashlib.sha512()
+    # continue with a copy of the precomputed hasher if the first argument is a known label
+    prefix_hasher = _PREFIX_HASHERS.get(indata[0]) if indata and isinstance(indata[0], str) else None
+    if prefix_hasher:
+        hasher = prefix_hasher.copy()
+        indata = indata[1:]
+    else:
+        hasher = hashlib.sha512()
+
     for data in indata:
         if isinstance(data, str):
             hasher.update(data.encode('utf-8'))
@@ -35,17 +47,23 @@ def hash_sha512(*indata):
 def aes_encrypt(mode, aes_key, aes_iv, *data):
     """
     Encrypt data with AES in specified mode.
+    Note: Only the encrypted value of the last data argument is returned. All previous values are only used to advance
+    the key stream.
+    :param mode: cipher mode e.g. modes.GCM
     :param aes_key: aes_key to use
     :param aes_iv: initialization vector
+    :param data: values to encrypt
+    :return: encrypted value, tag (None if the mode does not provide a tag)
     """
     encryptor = Cipher(algorithms.AES(aes_key), mode(aes_iv), backend=default_backend()).encryptor()
 
-    result = None
+    result = b""
     for value in data:
         result = encryptor.update(value)
-    encryptor.finalize()
+    # keep the output of finalize, which is empty for stream modes like GCM or CTR but not for block modes
+    result += encryptor.finalize()
 
-    return result, None if not hasattr(encryptor, 'tag') else encryptor.tag
+    return result, getattr(encryptor, 'tag', None)
 
 
 def new_credentials():
@@ -1,21 +1,24 @@
 """
 Main RAOPPlayGroup class to register receivers and start playback.
 """
-from enum import Enum
-from functools import partial
-from logging import getLogger
+from enum import IntEnum
+from functools import partial, wraps
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger, DEBUG, INFO
+from threading import Lock, Timer
 
 from .util import EventHook, random_int, random_hex
 from .remote import AirplayServer, AirplayCommand
 from .udp import UDPServer
-from .exceptions import PlayGroupClosedError
+from .config import KEEP_ALIVE_INTERVAL
+from .exceptions import PlayGroupClosedError, RTSPRequestTimeoutError
 from .audio import AudioSync, ms_to_seq_num, seq_num_to_ms
 
 
 group_logger = getLogger("RAOPPlaybackGroupLogger")
 
 
-class STATUS(Enum):
+class STATUS(IntEnum):
     PLAYING = 0
     PAUSED = 1
     STOPPED = 2
@@ -29,8 +32,9 @@ def is_alive(func):
     :param throw_exception:
     :return:
     """
+    @wraps(func)
     def func_wrapper(self, *args, **kwargs):
-        if self.status == STATUS.CLOSED:
+        if self._closed:
             raise PlayGroupClosedError("{0} is already closed. Create a new group.".format(self))
         return func(self, *args, **kwargs)
     return func_wrapper
@@ -55,10 +59,29 @@ class RAOPPlayGroup(object):
         self.name = name or str(id(self))
 
         # all raop receivers
+        # Note: receivers are hashed by identity. The RAOPServiceListener creates exactly one instance per service, so
+        # each device can only be added once.
         self._receivers = set()
+        # receivers might be added concurrently from different threads
+        self._receivers_lock = Lock()
+        # immutable copy of the receivers, which can be iterated while another thread changes the receivers
+        self._receivers_snapshot = ()
+        # the RTSP requests to all receivers are send in parallel
+        self._rtsp_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="raopy-rtsp")
+        # the handshakes of add_receivers use their own threads, this way they never delay a pause, resume or stop
+        self._handshake_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="raopy-handshake")
+        # control and timing port of the udp server, which are known as soon as the first receiver is added. The ports
+        # are reset to None when the sockets are closed again.
+        self._udp_ports = None
+        # the remote server is started as soon as the first receiver connected successfully
+        self._is_remote_server_started = False
+        # timer to periodically check if all receivers are still reachable
+        self._watchdog = None
         # the udp server for timing and control packets for all devices
         self._udp_server = UDPServer(receivers=self._receivers)
         self._udp_server.on_need_resend += self.on_need_resend
+        # bound method used on each sync request of the audio thread
+        self._send_control_sync = self._udp_server.send_control_sync
 
         # audio sync needs a reference to all devices to send the audio packets and to the udp server for sync packets
         self._audio_sync = AudioSync(receivers=self._receivers)
@@ -66,6 +89,9 @@ class RAOPPlayGroup(object):
 
         # current playback status
         self.status = STATUS.STOPPED
+        # cached closed state, which is cheaper to check than comparing the status enum
+        # Note: Only the user facing methods check it, the callbacks of the audio and udp threads never raise.
+        self._closed = False
 
         # create the Airplay sever to receive remote commands
         self._airplay_remote_server = AirplayServer(dacp_id=random_hex(8), active_remote=random_int(9), port=52486)
@@ -75,7 +101,8 @@ class RAOPPlayGroup(object):
         self._audio_sync.on_stream_ended += lambda *args: self.stop()
 
         # add logging for the basic stream events
-        self._audio_sync.on_need_sync += partial(self._log_event, "on_need_sync")
+        # Note: the sync event fires regularly on the audio thread while streaming, therefore it is only logged as debug
+        self._audio_sync.on_need_sync += partial(self._log_event, "on_need_sync", level=DEBUG)
         self._audio_sync.on_stream_started += partial(self._log_event, "on_stream_started")
         self._audio_sync.on_stream_paused += partial(self._log_event, "on_stream_paused")
         self._audio_sync.on_stream_ended += partial(self._log_event, "on_stream_ended")
@@ -90,12 +117,133 @@ class RAOPPlayGroup(object):
     def __str__(self):
         return "{0}<{1}>".format(self.__class__.__name__, self.name)
 
-    def _log_event(self, event_name, seq_num, *args, **kwargs):
+    @property
+    def receivers(self):
+        """
+        :return: immutable tuple of all receivers which are added to this group
+        """
+        return self._receivers_snapshot
+
+    def _for_each_receiver(self, func):
+        """
+        Call a (blocking) function for each receiver in parallel and wait until all calls are finished. A receiver
+        which fails does not abort the calls for the other receivers, the error is only logged.
+        :param func: function which takes the receiver as argument
+        :return: list with the result for each receiver (None if the call failed)
+        """
+        receivers = self._receivers_snapshot
+        futures = [self._rtsp_pool.submit(func, recv) for recv in receivers]
+
+        results = []
+        for recv, future in zip(receivers, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                group_logger.warning("%s request to %s failed: %s", str(self), str(recv), e)
+                results.append(None)
+        return results
+
+    def _start_watchdog(self):
+        """
+        Schedule the next keep alive check for all receivers.
+        """
+        self._stop_watchdog()
+        self._watchdog = Timer(KEEP_ALIVE_INTERVAL, self._check_alive)
+        self._watchdog.name = "raopy-watchdog-thread"
+        self._watchdog.daemon = True
+        self._watchdog.start()
+
+    def _stop_watchdog(self):
+        """
+        Cancel the periodic keep alive check.
+        """
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+
+    def _check_alive(self):
+        """
+        Send a keep alive request to all receivers and remove all receivers which are not reachable anymore. Otherwise
+        these receivers would block the session until the RTSP connection is cleared manually.
+        """
+        def is_alive(recv):
+            try:
+                recv.keep_alive()
+                return True
+            except (RTSPRequestTimeoutError, OSError):
+                return False
+
+        # the timer might fire while the group is closed
+        if self._closed:
+            return
+
+        receivers = self._receivers_snapshot
+        try:
+            for recv, alive in zip(receivers, self._rtsp_pool.map(is_alive, receivers)):
+                if alive:
+                    continue
+
+                # the group might have been closed while the keep alive requests were running
+                if self._closed:
+                    return
+
+                group_logger.info("%s lost connection to: %s", str(self), str(recv))
+                self.remove_receiver(recv)
+        except (RuntimeError, PlayGroupClosedError):
+            # the group was closed while the check was running and the thread pool is already shut down
+            return
+
+        # the watchdog is stopped if the last receiver was removed
+        with self._receivers_lock:
+            if self._watchdog and not self._closed:
+                self._start_watchdog()
+
+    def _open_sockets(self):
+        """
+        Open the udp and audio sockets and start the keep alive check. This must be called with the receivers lock held
+        before the first receiver is connected.
+        """
+        # open timing and control ports
+        self._udp_server.open()
+        self._udp_ports = self._udp_server.control.port, self._udp_server.timing.port
+        # open the audio port
+        self._audio_sync.open()
+        # check periodically if the receivers are still reachable
+        self._start_watchdog()
+
+    def _close_sockets(self):
+        """
+        Close the udp and audio sockets and stop the keep alive check. This must be called with the receivers lock held
+        after the last receiver was removed.
+        :return: True if the remote server was started and needs to be stopped, False otherwise
+        """
+        self._stop_watchdog()
+        self._udp_server.close()
+        self._audio_sync.close()
+        self._udp_ports = None
+
+        is_remote_server_started = self._is_remote_server_started
+        self._is_remote_server_started = False
+        return is_remote_server_started
+
+    def _refresh_receivers(self):
+        """
+        Update the snapshots of the receivers. This must be called with the receivers lock held each time a receiver
+        was added, removed or finished its handshake.
+        """
+        self._receivers_snapshot = tuple(self._receivers)
+        self._udp_server.refresh_receivers()
+        self._audio_sync.refresh_receivers()
+
+    def _log_event(self, event_name, seq_num, *args, level=INFO, **kwargs):
         """
         :param event_name: name of the received event
         :param seq_num: sequence number provided by the name
+        :param level: log level of the message
         """
-        group_logger.info("%s received event: %s at sequence: %s", str(self), event_name, str(seq_num))
+        # check the level first, this way nothing is formatted if the log is disabled
+        if group_logger.isEnabledFor(level):
+            group_logger.log(level, "%s received event: %s at sequence: %s", self, event_name, seq_num)
 
     # region callbacks
     def on_remote_command(self, command):
@@ -103,11 +251,10 @@ class RAOPPlayGroup(object):
         Received an airplay remote command.
         :param command:
         """
+        group_logger.debug("%s received remote command: %s", str(self), command)
         if command == AirplayCommand.PAUSE:
-            print("PAUUUUSSSSSEEE")
             self.pause()
         elif command == AirplayCommand.PLAY or command == AirplayCommand.PLAY_RESUME:
-            print("PLLLAAAAAYYYYY")
             self.play_resume()
 
     def on_need_resend(self, seq, receivers):
@@ -116,7 +263,7 @@ class RAOPPlayGroup(object):
         :param seq: sequence number
         :param receivers: list of receivers which should receive the packet
         """
-        self._audio_sync.send_packet(seq, receivers, is_resend=True)
+        self._audio_sync.resend_packet(seq, receivers)
 
     def on_need_sync(self, seq, receivers, is_first=False):
         """
@@ -125,7 +272,7 @@ class RAOPPlayGroup(object):
         :param receivers: list of receivers which should receive the packet
         :param is_first: True if this is the first packet
         """
-        self._udp_server.send_control_sync(seq, receivers, is_first=is_first)
+        self._send_control_sync(seq, receivers, is_first=is_first)
     # endregion
 
     # region connect / disconnect
@@ -155,43 +302,69 @@ class RAOPPlayGroup(object):
         :param credentials: optional credentials required for new devices
         :return: True on success, otherwise False
         """
-        if recv not in self._receivers:
-            # sequence number for rtsp request
-            start_seq = self._audio_sync.ref_seq
-
-            # find and open the udp ports for timing and control data as well as the audio socket
-            if len(self._receivers) == 0:
-                # open timing and control ports
-                self._udp_server.open()
-                # open the audio port
-                self._audio_sync.open()
+        with self._receivers_lock:
+            # the receiver was already added
+            if recv in self._receivers:
+                return False
 
             # add the device to the list, to allow the udp server to respond
             self._receivers.add(recv)
+            self._refresh_receivers()
 
-            udp_ports = self._udp_server.control.port, self._udp_server.timing.port
+            # sequence number for rtsp request
+            start_seq = self._audio_sync.ref_seq
 
-            try:
-                # update the dacp-id and active remote data to allow remote command
-                recv.dacp_id = self._airplay_remote_server.dacp_id
-                recv.active_remote = self._airplay_remote_server.active_remote
-                # connect the device
-                recv.connect(udp_ports, start_seq, password, credentials)
-
-                # start listening for remote commands if at least one device connected successfully
-                if len(self._receivers) == 1:
-                    self._airplay_remote_server.start()
-            except Exception as e:
-                # if the connection fails because of a password request or something like this we remove the device
-                self._receivers.remove(recv)
-                raise e
+            # find and open the udp ports for timing and control data as well as the audio socket
+            if self._udp_ports is None:
+                self._open_sockets()
+
+            udp_ports = self._udp_ports
+
+        # update the dacp-id and active remote data to allow remote command
+        recv.dacp_id = self._airplay_remote_server.dacp_id
+        recv.active_remote = self._airplay_remote_server.active_remote
+
+        # the handshake is performed outside of the lock, which allows connecting multiple receivers in parallel
+        try:
+            # connect the device
+            recv.connect(udp_ports, start_seq, password, credentials)
+            # the server port and the encryption type are only known after the handshake
+            with self._receivers_lock:
+                self._refresh_receivers()
+                # start listening for remote commands as soon as the first device connected successfully
+                start_remote_server = not self._is_remote_server_started
+                self._is_remote_server_started = True
+
+            if start_remote_server:
+                self._airplay_remote_server.start()
+        except Exception as e:
+            # if the connection fails because of a password request or something like this we remove the device
+            with self._receivers_lock:
+                self._receivers.discard(recv)
+                self._refresh_receivers()
+                # close the sockets again if no other receiver is connected or connecting
+                stop_remote_server = not self._receivers and self._close_sockets()
+
+            if stop_remote_server:
+                self._airplay_remote_server.stop()
+            raise e
 
-            # send an initial control sync
-            #if len(self._receivers) == 0:
-            #    self._udp_server.send_control_sync(start_seq, [recv], is_first=True)
+        # send an initial control sync
+        #if len(self._receivers) == 0:
+        #    self._udp_server.send_control_sync(start_seq, [recv], is_first=True)
 
-            return True
-        return False
+        return True
+
+    @is_alive
+    def add_receivers(self, receivers, password=None, credentials=None):
+        """
+        Add multiple airplay devices to the current playback session. The handshakes are performed in parallel.
+        :param receivers: list of RaopReceiver instances
+        :param password: optional password required for some devices
+        :param credentials: optional credentials required for new devices
+        :return: dictionary which maps each receiver to a future with the result of add_receiver
+        """
+        return {recv: self._handshake_pool.submit(self.add_receiver, recv, password, credentials) for recv in receivers}
 
     @is_alive
     def remove_receiver(self, recv):
@@ -200,20 +373,27 @@ class RAOPPlayGroup(object):
         :param device: RaopReceiver instance
         :return: True on succes, otherwise False
         """
-        if recv in self._receivers:
-            self._receivers.remove(recv)
+        with self._receivers_lock:
+            num_receivers = len(self._receivers)
+            self._receivers.discard(recv)
+            is_removed = len(self._receivers) != num_receivers
+            if is_removed:
+                self._refresh_receivers()
+
+        if is_removed:
             # close connection to airplay device
             recv.disconnect()
 
             # close the udp port if the last device was removed
-            if len(self._receivers) == 0:
+            if num_receivers == 1:
                 # stop playback
                 self.stop()
-                # close all sockets
-                self._udp_server.close()
-                self._audio_sync.close()
+                # close all sockets, unless another receiver was added in the meantime
+                with self._receivers_lock:
+                    stop_remote_server = not self._receivers and self._close_sockets()
                 # stop the remote server
-                self._airplay_remote_server.stop()
+                if stop_remote_server:
+                    self._airplay_remote_server.stop()
 
             return True
         return False
@@ -241,25 +421,29 @@ class RAOPPlayGroup(object):
         cur = self._audio_sync.current_seq_number
         end = self._audio_sync.total_seq_number
 
-        # if we wait to long between connect and play or pause and resume the RTSP connection might be shut down
-        # => establish an new RTSP connection to the airplay receiver
-        for recv in self._receivers:
+        # the track information
+        metadata = self._audio_sync.current_metadata
+        if not metadata:
+            title, artist, album = "", "", ""
+            images = []
+        else:
+            title, artist, album = metadata.track_name, metadata.artist_name, metadata.album_name
+            images = metadata.images() if metadata.supports_images() else []
+
+        def prepare_receiver(recv):
+            # if we wait to long between connect and play or pause and resume the RTSP connection might be shut down
+            # => establish an new RTSP connection to the airplay receiver
             recv.repair_connection(cur)
 
             # send the current progress
             recv.set_progress(start, cur, end)
 
             # send the track information
-            metadata = self._audio_sync.current_metadata
-            if not metadata:
-                title, artist, album = "", "", ""
-            else:
-                title, artist, album = metadata.track_name, metadata.artist_name, metadata.album_name
             recv.set_track_info(start, title=title, artist=artist, album=album)
-            if metadata.supports_images():
-                images = metadata.images()
-                if len(images) > 0:
-                    recv.set_artwork_data(start, images[0].data, images[0].mime_type)
+            if len(images) > 0:
+                recv.set_artwork_data(start, images[0].data, images[0].mime_type)
+
+        self._for_each_receiver(prepare_receiver)
 
         # start streaming the audio
         if self.status == STATUS.STOPPED:
@@ -312,12 +496,12 @@ class RAOPPlayGroup(object):
         cur_seq = self._audio_sync.current_seq_number
 
         # send a flush request for each receiver over rtsp
-        for receiver in self._receivers:
-            receiver.flush(cur_seq)
+        self._for_each_receiver(lambda receiver: receiver.flush(cur_seq))
 
         self.status = STATUS.PAUSED
 
-        print(self._audio_sync.current_seq_number)
+        if group_logger.isEnabledFor(DEBUG):
+            group_logger.debug("%s paused at sequence number: %s", self, cur_seq)
 
         # inform the user that the stream stopped
         #cur = cur_seq + self._audio_sync.sequence_latency-1
@@ -338,8 +522,7 @@ class RAOPPlayGroup(object):
         self._audio_sync.stop_streaming()
 
         # disconnect the RTSP connection
-        for receiver in self._receivers:
-            receiver.disconnect()
+        self._for_each_receiver(lambda receiver: receiver.disconnect())
 
         self.status = STATUS.STOPPED
 
@@ -354,10 +537,16 @@ class RAOPPlayGroup(object):
         if self.status != STATUS.STOPPED:
             self.stop()
 
+        self._stop_watchdog()
+
         # close the udp sockets
         self._udp_server.close()
 
+        self._rtsp_pool.shutdown(wait=False)
+        self._handshake_pool.shutdown(wait=False)
+
         self.status = STATUS.CLOSED
+        self._closed = True
     # endregion
 
     # region metadata
@@ -383,8 +572,7 @@ class RAOPPlayGroup(object):
             raise ValueError("Current time must be between start and end time.")
 
         # Send an RTSP Request to all devices to change the playback position
-        for recv in self._receivers:
-            recv.set_progress(start, cur, end)
+        self._for_each_receiver(lambda recv: recv.set_progress(start, cur, end))
 
         # inform all listener
         prg_res = self._audio_sync.set_progress(cur)
@@ -22,6 +22,11 @@ class RAOPReceiver(object):
         self.port = port  # raop service port
         self.hostname = hostname
 
+        # the string representation is used in many log messages, the values above never change after creation,
+        # because the RTSP client is bound to them
+        self._str = "<{0}>: name={1}, address={2}:{3}, server={4}".format(self.__class__.__name__, self.name, self.ip,
+                                                                          self.port, self.hostname)
+
         # create a RTSP client to send the data to the host
         self._rtsp_client = RTSPClient(self.ip, self.port, crypto=crypto, codecs=codecs)
 
@@ -33,11 +38,10 @@ class RAOPReceiver(object):
         self._rtsp_client.on_connection_closed += self.connection_closed
 
     def __str__(self):
-        return "<{0}>: name={1}, address={2}:{3}, server={4}".format(self.__class__.__name__, self.name, self.ip,
-                                                                     self.port, self.hostname)
+        return self._str
 
     def __repr__(self):
-        return str(self)
+        return self._str
 
     # region rstp client properties and callbacks
     @property
@@ -83,9 +87,9 @@ class RAOPReceiver(object):
     def connection_closed(self, reason):
         """
         Called when RTSP connection shut down.
-        :param reason: Reason why the rtsp server shut down.
+        :param reason: RTSPReason why the rtsp server shut down.
         """
-        # if the
+        # the connection was closed unexpectedly, make sure that it is closed completely
         if reason != RTSPReason.NORMAL:
             self.disconnect()
 
@@ -171,6 +175,13 @@ class RAOPReceiver(object):
     @property
     def is_connected(self):
         return self._rtsp_is_connected
+
+    def keep_alive(self):
+        """
+        Check if the receiver is still reachable. Raises an RTSPRequestTimeoutError if the receiver does not respond.
+        :return: True on success, False otherwise
+        """
+        return self._rtsp_client.keep_alive()
     # endregion
 
     # region control / metadata
@@ -59,10 +59,12 @@ class RAOPServiceListener(object):
             logger.warning("Could not load airplay service information. Skipping device: {0}".format(name))
             return
 
-        self.devices[name] = RAOPReceiver(name=info.name,
-                                          address=info.address,
-                                          port=info.port,
-                                          hostname=info.server)
+        # reuse the receiver instance if the service is announced again, to prevent duplicated receivers
+        if name not in self.devices:
+            self.devices[name] = RAOPReceiver(name=info.name,
+                                              address=info.address,
+                                              port=info.port,
+                                              hostname=info.server)
         logger.info("Add airplay service: {0}".format(name))
         self.on_connect.fire(self.devices[name], name=name, info=info)
 
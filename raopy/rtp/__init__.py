@@ -1,5 +1,4 @@
 from ..config import FRAMES_PER_PACKET, RAOP_FRAME_LATENCY
-from ..util import low32
 from .rtpheader import RtpHeader
 
 
@@ -10,9 +9,10 @@ def rtp_timestamp_for_seq(seq, include_latency=True):
     :param include_latency: True to include the latency, False otherwise
     :return: rtp timestamp for this packet
     """
+    # the lower 32 bits are masked inline, this function runs for every audio packet
     if include_latency:
-        return low32(seq * FRAMES_PER_PACKET + RAOP_FRAME_LATENCY)
-    return low32(seq * FRAMES_PER_PACKET)
+        return (seq * FRAMES_PER_PACKET + RAOP_FRAME_LATENCY) & 0xFFFFFFFF
+    return (seq * FRAMES_PER_PACKET) & 0xFFFFFFFF
 
 
 __all__ = ["RtpHeader", "rtp_timestamp_for_seq"]
\ No newline at end of file
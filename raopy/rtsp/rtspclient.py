@@ -2,7 +2,7 @@
 Handle the rtsp connection between the client and the receiver.
 
 """
-from threading import Lock
+from threading import RLock
 
 try:
     from queue import Empty
@@ -120,8 +120,9 @@ class RTSPClient(object):
         self.on_connection_ready = EventHook()
         self.on_connection_closed = EventHook()
 
-        # default lock to prevent sending multiple requests at once
-        self._lock = Lock()
+        # default lock to prevent sending multiple requests at once. The lock must be reentrant, because a failed request
+        # calls cleanup, which sends a TEARDOWN request while the lock is still held.
+        self._lock = RLock()
 
         # RTSP protocol version number (1.0 seems to be the only one at the moment)
         self.protocol_version = protocol_version
@@ -264,7 +265,7 @@ class RTSPClient(object):
             pass
 
         self._status = RTSPStatus.CLOSED
-        self.on_connection_closed.fire(reason.name)
+        self.on_connection_closed.fire(reason)
 
         # close the socket
         self.connection.close()
@@ -272,7 +273,7 @@ class RTSPClient(object):
         logger.info("Connection closed with reason: %s\n%s", reason.name, str(self))
     # endregion
 
-    # region stream control commands: TEARDOWN / FLUSH
+    # region stream control commands: TEARDOWN / FLUSH / KEEP ALIVE
     @mutex_lock
     def teardown(self, digest_info=None):
         """
@@ -321,6 +322,28 @@ class RTSPClient(object):
             return res.code == 200
 
         return False
+
+    @mutex_lock
+    def keep_alive(self, digest_info=None):
+        """
+        Send an OPTIONS request to check if the receiver is still reachable.
+        :param digest_info: (optional) information for password protected devices
+        :return True on success, otherwise False
+        """
+        if self._status == RTSPStatus.PLAYING:
+            if not digest_info:
+                digest_info = self.digest_info
+
+            self._status = RTSPStatus.OPTIONS
+            try:
+                req = self.get_options_request(digest_info)
+                res = self.send_and_recv(req)
+            finally:
+                # keep the CLOSED status if the request failed and the connection was cleaned up
+                if self._status == RTSPStatus.OPTIONS:
+                    self._status = RTSPStatus.PLAYING
+            return res.code == 200
+        return False
     # endregion
 
     # region media control commands: VOLUME, PROGRESS, DMAP, ARTWORK
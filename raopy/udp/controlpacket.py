@@ -1,10 +1,15 @@
-from struct import unpack_from, pack
+from struct import Struct
 
 from ..rtp import RtpHeader
 from ..util import NtpTime, low16
 
 CONTROL_RANGE_RESEND = 0x55
 
+# rtp header (a, b, seqnum), missed sequence number and count
+RESEND_PACKET = Struct(">BBHHH")
+# rtp header (a, b, seqnum), rtp timestamp minus latency, ntp time of the sync and current rtp timestamp
+SYNC_PACKET = Struct(">BBHIIII")
+
 
 class ResendPacket(object):
     __slots__ = ["rtp_header", "missed_seqnum", "count", "_data"]
@@ -25,14 +30,15 @@ class ResendPacket(object):
         try:
             # create timing packet
             control_packet = cls()
-            control_packet.rtp_header = RtpHeader(*unpack_from(">BBH", data, 0))
+            a, b, seqnum, missed_seqnum, count = RESEND_PACKET.unpack_from(data, 0)
+            control_packet.rtp_header = RtpHeader(a, b, seqnum)
 
             # malformed data
             if control_packet.rtp_header.payload_type != CONTROL_RANGE_RESEND:
                 return None
 
-            control_packet.missed_seqnum = unpack_from(">H", data, 4)[0]
-            control_packet.count = unpack_from(">H", data, 6)[0]
+            control_packet.missed_seqnum = missed_seqnum
+            control_packet.count = count
             control_packet._data = data
             return control_packet
         except Exception as e:
@@ -58,8 +64,8 @@ class SyncPacket(object):
 
         sec, frac = time_last_sync
         try:
-            data = pack(">BBHIIII", rtp_header.a, rtp_header.b, low16(rtp_header.seqnum), now_minus_latency, sec, frac,
-                        now)
+            data = SYNC_PACKET.pack(rtp_header.a, rtp_header.b, low16(rtp_header.seqnum), now_minus_latency, sec, frac,
+                                    now)
         except:
             return None
 
@@ -2,7 +2,7 @@
 Header send over upd.
 For details see: https://git.zx2c4.com/Airtunes2/about/#replying-to-timing-packet
 """
-from struct import unpack_from, pack
+from struct import Struct
 from ..rtp import RtpHeader
 from ..util import NtpTime
 
@@ -10,6 +10,9 @@ TIMING_PACKET_SIZE = 32
 TIMING_REQUEST_PAYLOAD = 0x52
 TIMING_RESPONSE_PAYLOAD = 0x53
 
+# rtp header (a, b, seqnum), zero padding, reference time, received time and send time
+TIMING_PACKET = Struct(">BBHIIIIIII")
+
 
 class TimingPacket(object):
     __slots__ = ["rtp_header", "zero_padding", "reference_time", "received_time", "send_time", "_data"]
@@ -24,16 +27,18 @@ class TimingPacket(object):
         try:
             # create timing packet
             timing_packet = cls()
-            timing_packet.rtp_header = RtpHeader(*unpack_from(">BBH", data, 0))
+            a, b, seqnum, zero_padding, ref_sec, ref_frac, rec_sec, rec_frac, sen_sec, sen_frac = \
+                TIMING_PACKET.unpack_from(data, 0)
+            timing_packet.rtp_header = RtpHeader(a, b, seqnum)
 
             # malformed data
             if timing_packet.rtp_header.payload_type != TIMING_REQUEST_PAYLOAD:
                 return None
 
-            timing_packet.zero_padding = unpack_from(">I", data, 4)[0]
-            timing_packet.reference_time = NtpTime(*unpack_from(">II", data, 8))
-            timing_packet.received_time = NtpTime(*unpack_from(">II", data, 16))
-            timing_packet.send_time = NtpTime(*unpack_from(">II", data, 24))
+            timing_packet.zero_padding = zero_padding
+            timing_packet.reference_time = NtpTime(ref_sec, ref_frac)
+            timing_packet.received_time = NtpTime(rec_sec, rec_frac)
+            timing_packet.send_time = NtpTime(sen_sec, sen_frac)
             timing_packet._data = data
             return timing_packet
         except:
@@ -59,8 +64,8 @@ class TimingPacket(object):
             ref_sec, ref_frac = reference_time
             rec_sec, rec_frac = received_time
             sen_sec, sen_frac = send_time
-            data = pack(">BBHIIIIIII", rtp_header.a, rtp_header.b, rtp_header.seqnum, zero_padding,
-                        ref_sec, ref_frac, rec_sec, rec_frac, sen_sec, sen_frac)
+            data = TIMING_PACKET.pack(rtp_header.a, rtp_header.b, rtp_header.seqnum, zero_padding,
+                                      ref_sec, ref_frac, rec_sec, rec_frac, sen_sec, sen_frac)
         except:
             return None
 
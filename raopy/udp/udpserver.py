@@ -4,7 +4,7 @@ This class processes all timing and control requests from all clients and send s
 """
 
 import socket
-from logging import getLogger
+from logging import getLogger, DEBUG
 from collections import namedtuple
 from select import select
 from threading import Thread
@@ -56,12 +56,22 @@ class UDPServer(object):
         NtpTime.initialize()
 
         self._receivers = receivers
+        # immutable copy of the receivers, which is used by the listener threads. Call refresh_receivers each time the
+        # receivers change.
+        self._receivers_snapshot = tuple(receivers)
         self.timing = None
         self.control = None
 
         # callback when a lost packet should be resend
         self.on_need_resend = EventHook()
 
+    def refresh_receivers(self):
+        """
+        Update the copy of the receivers used by the listener threads. This must be called after a receiver was added
+        or removed.
+        """
+        self._receivers_snapshot = tuple(self._receivers)
+
     def open(self):
         """
         Find open sockets for control and timing port, open them and listen for incoming connections.
@@ -101,26 +111,30 @@ class UDPServer(object):
         if not self.control.socket:
             return
 
-        # send to all receivers on default
+        # send to all receivers on default, the snapshot does not contain duplicates. Receivers passed by the caller
+        # are deduplicated while keeping their order.
         if receivers is None:
-            receivers = self._receivers
+            receivers = self._receivers_snapshot
+        else:
+            receivers = dict.fromkeys(receivers)
 
-        ntp_time = NtpTime.get_timestamp()
-
-        for receiver in set(receivers):
-            if not receiver.control_port:
-                print("no control port....")
-                return
+        # receivers without a control port did not finish the handshake yet
+        addresses = [(receiver.ip, receiver.control_port) for receiver in receivers if receiver.control_port]
+        if not addresses:
+            return
 
-            sync_packet = SyncPacket.create(is_first=is_first,
-                                            now_minus_latency=rtp_timestamp_for_seq(seq, include_latency=False),
-                                            now=rtp_timestamp_for_seq(seq),
-                                            time_last_sync=ntp_time)
+        # the sync packet is the same for all receivers
+        sync_packet = SyncPacket.create(is_first=is_first,
+                                        now_minus_latency=rtp_timestamp_for_seq(seq, include_latency=False),
+                                        now=rtp_timestamp_for_seq(seq),
+                                        time_last_sync=NtpTime.get_timestamp())
+        data = sync_packet.to_data()
 
-            print("Send control: ", receiver.ip, seq, rtp_timestamp_for_seq(seq), is_first)
-            dest = (receiver.ip, receiver.control_port)
-            control_logger.debug("Send control packet tp {0}:\n\033[91m{1}\033[0m".format(dest, sync_packet))
-            self.control.socket.sendto(sync_packet.to_data(), dest)
+        if control_logger.isEnabledFor(DEBUG):
+            for dest in addresses:
+                control_logger.debug("Send control packet to {0}:\n\033[91m{1}\033[0m".format(dest, sync_packet))
+        for dest in addresses:
+            self.control.socket.sendto(data, dest)
 
     def start_responding(self):
         """
@@ -144,7 +158,7 @@ class UDPServer(object):
                     response = TimingPacket.parse(data)
 
                     # only listen to known receivers
-                    recvs = [r for r in self._receivers if r.ip == addr[0]]
+                    recvs = [r for r in self._receivers_snapshot if r.ip == addr[0]]
                     if len(recvs) == 0:
                         continue
 
@@ -173,7 +187,7 @@ class UDPServer(object):
                     data, addr = self.control.socket.recvfrom(1024)
 
                     # only listen to known receivers
-                    recvs = [r for r in self._receivers if r.ip == addr[0]]
+                    recvs = [r for r in self._receivers_snapshot if r.ip == addr[0]]
                     if len(recvs) == 0:
                         continue
 
@@ -183,8 +197,7 @@ class UDPServer(object):
                     control_logger.debug("Received control packet from {0}:\n\033[94m{1}\033[0m".format(addr, response))
 
                     # request a resend
-                    print("Request resend: ", response.missed_seqnum)
-                    self.on_need_resend.fire(response.missed_seqnum, set(recvs))
+                    self.on_need_resend.fire(response.missed_seqnum, tuple(recvs))
                 except (OSError, ValueError):
                     # socket closed
                     break
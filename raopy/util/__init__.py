@@ -5,13 +5,12 @@ from .helper import to_bytes, binary_ip_to_string, to_hex, to_unicode, get_ip_ad
     parse_plist_from_bytes
 from .numeric import random_hex, random_int, low32, low16
 from .event import EventHook
-from .log import LOG, set_loglevel, set_logs_enabled
+from .log import LOG, set_loglevel, set_logs_enabled, configure_logs
 
 
 # change the loglevel for each logger to only output info level logs
-set_logs_enabled(LOG.ALL)
-set_loglevel(LOG.ALL, logging.INFO)
+configure_logs(LOG.ALL, logging.INFO)
 
-__all__ = ["EventHook", "NtpTime", "milliseconds_since_1970", "LOG", "set_loglevel", "set_logs_enabled", "random_int",
-           "random_hex", "low32", "low16", "to_bytes", "binary_ip_to_string", "to_hex", "to_unicode", "get_ip_address",
-           "write_plist_to_bytes", "parse_plist_from_bytes"]
\ No newline at end of file
+__all__ = ["EventHook", "NtpTime", "milliseconds_since_1970", "LOG", "set_loglevel", "set_logs_enabled",
+           "configure_logs", "random_int", "random_hex", "low32", "low16", "to_bytes", "binary_ip_to_string", "to_hex",
+           "to_unicode", "get_ip_address", "write_plist_to_bytes", "parse_plist_from_bytes"]
\ No newline at end of file
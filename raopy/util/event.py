@@ -2,18 +2,36 @@ class EventHook(object):
     """
     Event handling class.
     """
+    __slots__ = ["_handlers"]
 
     def __init__(self):
-        self._handlers = []
+        # handlers are stored as immutable tuple, this way fire can iterate it without a copy, even if a handler is
+        # added or removed by another thread
+        self._handlers = ()
+
+    @property
+    def handlers(self):
+        """
+        :return: immutable tuple of all registered handlers, which can be called directly in performance critical code
+        """
+        return self._handlers
 
     def __iadd__(self, handler):
-        self._handlers.append(handler)
+        self._handlers += (handler,)
         return self
 
     def __isub__(self, handler):
-        self._handlers.remove(handler)
+        handlers = list(self._handlers)
+        handlers.remove(handler)
+        self._handlers = tuple(handlers)
         return self
 
     def fire(self, *args, **keywargs):
-        for handler in self._handlers:
-            handler(*args, **keywargs)
\ No newline at end of file
+        handlers = self._handlers
+        # fast path for the common case of a single handler
+        if len(handlers) == 1:
+            handlers[0](*args, **keywargs)
+            return
+
+        for handler in handlers:
+            handler(*args, **keywargs)
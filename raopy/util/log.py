@@ -79,3 +79,14 @@ def set_loglevel(logs, level):
 
     # the basic config needs to be enabled for the lowest required loglevel
     logging.basicConfig(level=min_log_level)
+
+
+def configure_logs(logs, level):
+    """
+    Enable the specified logs and change their log level in one go.
+    Usage: configure_logs(LOG.RTSP | LOG.TIMING, logging.DEBUG)
+    :param logs: different logs to enable
+    :param level: log level for the enabled logs
+    """
+    set_logs_enabled(logs)
+    set_loglevel(logs, level)
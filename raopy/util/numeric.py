@@ -34,12 +34,12 @@ def low16(i):
     :param i: number
     :return: lower 16 bits of number
     """
-    return i % 65536
+    return i & 0xFFFF
 
 
 def low32(i):
     """
     :param i: number
-    :return: lower 16 bits of number
+    :return: lower 32 bits of number
     """
-    return i % 4294967296
\ No newline at end of file
+    return i & 0xFFFFFFFF
\ No newline at end of file
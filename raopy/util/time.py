@@ -1,4 +1,4 @@
-from datetime import datetime
+from time import time_ns
 
 from ..exceptions import MissingNtpReferenceTime
 
@@ -7,7 +7,7 @@ def milliseconds_since_1970():
     """
     :return: milliseconds since 01.01.1970 as integer
     """
-    return int((datetime.utcnow() - datetime(1970, 1, 1)).total_seconds()*1000)
+    return time_ns() // 1000000
 
 
 class NtpTime(object):
@@ -50,6 +50,7 @@ class NtpTime(object):
             raise MissingNtpReferenceTime("Use NtpTime.initialize to set a reference time.")
 
         time = milliseconds_since_1970() - NtpTime.reference_time
-        sec = int(time/1000)
-        frac = int((time - sec*1000)*4294967.296)
+        # the fraction is given in units of 1/2^32 seconds, use integer arithmetic only to avoid rounding errors
+        sec, millisec = divmod(time, 1000)
+        frac = (millisec << 32) // 1000
         return cls(sec, frac)
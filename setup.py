@@ -1,3 +1,4 @@
+import os
 import sys
 import setuptools
 
@@ -25,6 +26,12 @@ class get_pybind_include(object):
         return pybind11.get_include(self.user)
 
 
+# OpenSSL for the aes encryption and the socket library on windows
+if sys.platform == 'win32':
+    libraries = ['libcrypto', 'ws2_32']
+else:
+    libraries = ['crypto']
+
 ext_modules = [
     Extension(
         "raopy.alac.libalac",
@@ -35,6 +42,7 @@ ext_modules = [
             get_pybind_include(),
             get_pybind_include(user=True)
         ],
+        libraries=libraries,
         language='c++'
     ),
 ]
@@ -70,6 +78,33 @@ def cpp_flag(compiler):
                            'is needed!')
 
 
+def optimization_flags(compiler):
+    """Return the optimization flags for the compile and the link step.
+
+    The encoder is always build with -O3. Builds for the local machine can set
+    RAOPY_NATIVE=1 to optimize for the host cpu. Profile guided optimization is
+    enabled by building once with RAOPY_PGO=generate, streaming a track to
+    collect the profile and rebuilding with RAOPY_PGO=use.
+    """
+    compile_opts = []
+    link_opts = []
+    if has_flag(compiler, '-O3'):
+        compile_opts.append('-O3')
+    if os.environ.get('RAOPY_NATIVE') == '1' and has_flag(compiler, '-march=native'):
+        compile_opts.append('-march=native')
+
+    pgo = os.environ.get('RAOPY_PGO')
+    if pgo == 'generate':
+        compile_opts.append('-fprofile-generate')
+        link_opts.append('-fprofile-generate')
+    elif pgo == 'use':
+        compile_opts += ['-fprofile-use', '-fprofile-correction']
+        link_opts.append('-fprofile-use')
+    elif pgo:
+        raise RuntimeError('RAOPY_PGO must be either "generate" or "use".')
+    return compile_opts, link_opts
+
+
 class BuildExt(build_ext):
     """A custom build extension for adding compiler-specific options."""
     c_opts = {
@@ -83,15 +118,19 @@ class BuildExt(build_ext):
     def build_extensions(self):
         ct = self.compiler.compiler_type
         opts = self.c_opts.get(ct, [])
+        link_opts = []
         if ct == 'unix':
             opts.append('-DVERSION_INFO="%s"' % self.distribution.get_version())
             #opts.append(cpp_flag(self.compiler))
             if has_flag(self.compiler, '-fvisibility=hidden'):
                 opts.append('-fvisibility=hidden')
+            compile_opts, link_opts = optimization_flags(self.compiler)
+            opts += compile_opts
         elif ct == 'msvc':
             opts.append('/DVERSION_INFO=\\"%s\\"' % self.distribution.get_version())
         for ext in self.extensions:
             ext.extra_compile_args = opts
+            ext.extra_link_args = link_opts
         build_ext.build_extensions(self)
 
 setup(